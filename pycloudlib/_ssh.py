@@ -0,0 +1,278 @@
+# This file is part of pycloudlib. See LICENSE file for license information.
+"""Helpers to run commands over SSH, copy files over SFTP and parse private keys.
+
+Used by instances to run commands over SSH, either one at a time or on
+several channels concurrently.
+"""
+
+import functools
+import inspect
+import logging
+import re
+import select
+from typing import List, Optional, Tuple
+
+import paramiko
+from paramiko.ssh_exception import PasswordRequiredException, SSHException
+
+from pycloudlib.result import Result
+from pycloudlib.util import shell_pack
+
+_RECV_SIZE = 65536
+# Chunk size used when streaming files over SFTP
+_SFTP_CHUNK_SIZE = 1 << 20
+# Words which the shell doesn't need quoted, as per shlex.quote
+_PLAIN_WORD = re.compile(r"[\w@%+=:,./-]+", re.ASCII)
+_WHITESPACE = frozenset(b" \t\n\r\x0b\x0c")
+# paramiko < 3.3 can't bound the number of prefetch requests in flight
+_PREFETCH_BOUNDED = (
+    "max_concurrent_requests" in inspect.signature(paramiko.SFTPFile.prefetch).parameters
+)
+
+
+def pack_command(command: Tuple) -> str:
+    """Return the shell string to run a command over SSH.
+
+    Commands made only of words which need no quoting are sent as they
+    are, as any remote login shell runs them the same way. Others are
+    packed with `shell_pack`, which involves spawning `getopt` locally and
+    adds up when waiting for an instance repeatedly executes the same
+    commands: the result is memoized for commands made of strings.
+    Other arguments, e.g. paths or bytes, are packed as `shell_pack` does.
+    """
+    if all(isinstance(arg, str) for arg in command):
+        return _pack_str_command(command)
+    return shell_pack(list(command))
+
+
+@functools.lru_cache(maxsize=128)
+def _pack_str_command(command: Tuple[str, ...]) -> str:
+    # A first word containing "=" would become a variable assignment
+    if command and "=" not in command[0] and all(_PLAIN_WORD.fullmatch(arg) for arg in command):
+        return " ".join(command)
+    return shell_pack(list(command))
+
+
+def recv_available(channel, out_buf, err_buf) -> bool:
+    """Read the stdout and stderr available on a channel into buffers.
+
+    Both streams are drained as data arrives rather than reading one to EOF
+    before the other: a command filling up its stderr window while we block
+    on stdout would otherwise stall forever.
+
+    Args:
+        channel: paramiko.Channel to read from
+        out_buf: bytearray extended with stdout
+        err_buf: bytearray extended with stderr
+
+    Returns:
+        True once the remote end sent EOF and all of the output was read.
+        The exit status may be sent before the last output, so it isn't a
+        sign that everything was read.
+    """
+    while channel.recv_ready():
+        out_buf += channel.recv(_RECV_SIZE)
+    while channel.recv_stderr_ready():
+        err_buf += channel.recv_stderr(_RECV_SIZE)
+    return (
+        (channel.eof_received or channel.closed)
+        and not channel.recv_ready()
+        and not channel.recv_stderr_ready()
+    )
+
+
+def drain_channel(channel, out_buf, err_buf, done=None) -> bool:
+    """Read the stdout and stderr of a channel into buffers as data arrives.
+
+    Args:
+        channel: paramiko.Channel to read from
+        out_buf: bytearray extended with stdout
+        err_buf: bytearray extended with stderr
+        done: optional callable, returning True once enough was read
+
+    Returns:
+        True if done() returned True, False once the remote command exited
+        and all of its output was read
+    """
+    while True:
+        select.select([channel], [], [], 0.1)
+        finished = recv_available(channel, out_buf, err_buf)
+        if done is not None and done():
+            return True
+        if finished:
+            return False
+
+
+class _EndMarkers:
+    """Look for the markers ending stdout and stderr as output is read.
+
+    Only output read since the previous check is searched, plus enough of
+    the previous output for markers split between reads, so that long
+    outputs aren't scanned over and over.
+    """
+
+    def __init__(self, marker: bytes, out_buf: bytearray, err_buf: bytearray):
+        self._out_end = re.compile(rb"\n" + re.escape(marker) + rb":(\d+)\n")
+        self._err_end = b"\n" + marker + b"\n"
+        # The stdout marker is the stderr one with the exit status added
+        self._overlap = len(self._err_end) + 16
+        self._out_buf = out_buf
+        self._err_buf = err_buf
+        self._out_searched = 0
+        self._err_searched = 0
+        self.out_match: Optional["re.Match[bytes]"] = None
+        self.err_end = -1
+
+    def __call__(self) -> bool:
+        if self.out_match is None:
+            start = max(self._out_searched - self._overlap, 0)
+            self.out_match = self._out_end.search(self._out_buf, start)
+            self._out_searched = len(self._out_buf)
+        if self.err_end < 0:
+            start = max(self._err_searched - self._overlap, 0)
+            self.err_end = self._err_buf.find(self._err_end, start)
+            self._err_searched = len(self._err_buf)
+        return self.out_match is not None and self.err_end >= 0
+
+
+def drain_until_marker(channel, out_buf, err_buf, marker: bytes) -> Optional[Tuple[int, int, int]]:
+    """Read the output of a channel until a command wrote its end markers.
+
+    The command is expected to end its stderr with the marker on a line of
+    its own, and its stdout with a line of the marker, ":" and its exit
+    status.
+
+    Args:
+        channel: paramiko.Channel to read from
+        out_buf: bytearray extended with stdout
+        err_buf: bytearray extended with stderr
+        marker: unique marker written by the command
+
+    Returns:
+        The indexes where the stdout and stderr of the command end, and its
+        exit status, or None if the remote end exited before the markers
+    """
+    end_markers = _EndMarkers(marker, out_buf, err_buf)
+    if not drain_channel(channel, out_buf, err_buf, done=end_markers) or not end_markers.out_match:
+        return None
+    match = end_markers.out_match
+    return match.start(), end_markers.err_end, int(match.group(1))
+
+
+def collect_results(channels) -> List[Result]:
+    """Wait for the commands running on channels, draining them concurrently.
+
+    Args:
+        channels: paramiko.Channel objects the commands were started on
+
+    Returns:
+        list of the Result of each command, in the order of channels
+    """
+    buffers = [(bytearray(), bytearray()) for _ in channels]
+    pending = list(range(len(channels)))
+    while pending:
+        select.select([channels[i] for i in pending], [], [], 0.1)
+        pending = [i for i in pending if not recv_available(channels[i], *buffers[i])]
+    return [
+        Result(decode_output(out_buf), decode_output(err_buf), channel.recv_exit_status())
+        for channel, (out_buf, err_buf) in zip(channels, buffers)
+    ]
+
+
+def prefetch(remote_file, max_concurrent_requests: int):
+    """Start reading a remote file ahead, keeping many requests in flight.
+
+    Args:
+        remote_file: paramiko.SFTPFile to prefetch
+        max_concurrent_requests: maximum number of read requests in flight,
+            ignored with paramiko < 3.3
+    """
+    if _PREFETCH_BOUNDED:
+        remote_file.prefetch(max_concurrent_requests=max_concurrent_requests)
+    else:
+        remote_file.prefetch()
+
+
+def copy_file(src, dst):
+    """Copy the contents of file object src to dst.
+
+    Chunks are read into a single reused buffer, and written from views of
+    it, rather than allocating new bytes objects for each chunk.
+    """
+    buf = bytearray(_SFTP_CHUNK_SIZE)
+    with memoryview(buf) as view:
+        while True:
+            size = src.readinto(buf)
+            if not size:
+                break
+            dst.write(view[:size])
+
+
+def decode_output(buf: bytearray, end: Optional[int] = None) -> str:
+    """Decode command output, without its trailing whitespace.
+
+    Decoding straight from a view of the buffer avoids copying the whole
+    output into intermediate bytes objects first.
+
+    Args:
+        buf: output to decode
+        end: optional index where the output to decode ends
+    """
+    if end is None:
+        end = len(buf)
+    while end and buf[end - 1] in _WHITESPACE:
+        end -= 1
+    with memoryview(buf) as view:
+        return str(view[:end], "utf-8")
+
+
+def _warn_passphrase_required(path: str):
+    logging.getLogger(__name__).warning(
+        "The specified key (%s) requires a passphrase. If you have"
+        " not added this key to a running SSH agent, you will see"
+        " failures to connect after a long timeout.",
+        path,
+    )
+
+
+def _parse_private_key_by_type(path: str) -> Optional[paramiko.PKey]:
+    """Parse a private key by trying each supported key type in turn.
+
+    Only used with paramiko < 3.2, which can't detect the type of a key.
+    """
+    for key_cls in (paramiko.Ed25519Key, paramiko.ECDSAKey, paramiko.RSAKey):
+        try:
+            return key_cls.from_private_key_file(path)
+        except PasswordRequiredException:
+            _warn_passphrase_required(path)
+            return None
+        except (SSHException, OSError):
+            continue
+    return None
+
+
+@functools.lru_cache(maxsize=32)
+def parse_private_key(path: str, mtime_ns: int) -> Optional[paramiko.PKey]:
+    """Return the memoized private key parsed from path.
+
+    The modification time is only part of the cache key, so that a key
+    replaced in place gets parsed again. Keys requiring a passphrase are
+    cached as well, so they aren't parsed and warned about again for every
+    new instance.
+
+    Returns:
+        paramiko.PKey, or None if the key type isn't supported or the key
+        requires a passphrase
+    """
+    # pylint: disable=unused-argument
+    if not hasattr(paramiko.PKey, "from_path"):
+        return _parse_private_key_by_type(path)
+    # Detect the type from the key itself rather than trying each type
+    try:
+        return paramiko.PKey.from_path(path)
+    except TypeError:
+        # Raised for keys requiring a passphrase
+        _warn_passphrase_required(path)
+    except (paramiko.UnknownKeyType, SSHException, ValueError, OSError):
+        pass
+    return None
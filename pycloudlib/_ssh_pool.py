@@ -0,0 +1,146 @@
+# This file is part of pycloudlib. See LICENSE file for license information.
+"""Process-wide pool of authenticated SSH connections.
+
+Instance objects are frequently re-created for the same machine, e.g. by
+test suites. Sharing connections between them avoids paying the TCP
+handshake, key exchange and authentication costs on every connection.
+
+Clients handed out by get and put are held by the caller until it calls
+release: a client is only closed once it is neither pooled nor held, so
+dropping it from the pool never breaks instances still using it.
+"""
+
+import atexit
+import threading
+import time
+from typing import Dict, Hashable, Optional, OrderedDict, Tuple
+
+import paramiko
+
+# Number of connections kept open before the least recently used is closed
+MAX_CONNECTIONS = 32
+# Seconds after which a connection is no longer handed out and replaced.
+# Long-lived connections are more likely to have been silently dropped by
+# middleboxes, or to be left behind by instances restarted under them.
+MAX_AGE = 60 * 60
+
+_lock = threading.Lock()
+# Pooled clients, with the monotonic time at which they were added
+_clients: OrderedDict[Hashable, Tuple[paramiko.SSHClient, float]] = OrderedDict()
+# Number of holders of each client handed out
+_holders: Dict[paramiko.SSHClient, int] = {}
+
+
+def _close(client: paramiko.SSHClient):
+    try:
+        client.close()
+    except (paramiko.SSHException, OSError):
+        pass
+
+
+def is_active(client: paramiko.SSHClient) -> bool:
+    """Return whether client is connected, closed clients having no transport."""
+    transport = client.get_transport()
+    return transport is not None and transport.is_active()
+
+
+def _pooled(client: paramiko.SSHClient) -> bool:
+    return any(pooled is client for pooled, _ in _clients.values())
+
+
+def _unused(clients) -> list:
+    """Return which of clients dropped from the pool can be closed."""
+    return [client for client in clients if client not in _holders and not _pooled(client)]
+
+
+def get(key: Hashable) -> Optional[paramiko.SSHClient]:
+    """Return the active pooled client for key, if any.
+
+    The caller holds the returned client until it releases it.
+    Connections which are no longer active, or older than MAX_AGE, are
+    dropped from the pool.
+    """
+    with _lock:
+        entry = _clients.get(key)
+        if entry is None:
+            return None
+        client, added_at = entry
+        if time.monotonic() - added_at > MAX_AGE or not is_active(client):
+            del _clients[key]
+            stale = _unused([client])
+        else:
+            _clients.move_to_end(key)
+            _holders[client] = _holders.get(client, 0) + 1
+            return client
+    for unused in stale:
+        _close(unused)
+    return None
+
+
+def put(key: Hashable, client: paramiko.SSHClient):
+    """Add client to the pool, evicting least recently used connections.
+
+    The caller holds the client until it releases it.
+    """
+    evicted = []
+    with _lock:
+        previous = _clients.pop(key, None)
+        if previous is not None and previous[0] is not client:
+            evicted.append(previous[0])
+        _clients[key] = (client, time.monotonic())
+        _holders[client] = _holders.get(client, 0) + 1
+        while len(_clients) > MAX_CONNECTIONS:
+            evicted.append(_clients.popitem(last=False)[1][0])
+        evicted = _unused(evicted)
+    for stale in evicted:
+        _close(stale)
+
+
+def release(client: paramiko.SSHClient):
+    """Stop holding a client handed out by get or put.
+
+    The client is closed if it is no longer pooled nor held.
+    """
+    with _lock:
+        count = _holders.get(client)
+        if count is None:
+            return
+        if count > 1:
+            _holders[client] = count - 1
+            return
+        del _holders[client]
+        if _pooled(client):
+            return
+    _close(client)
+
+
+def discard(key: Hashable, client: Optional[paramiko.SSHClient] = None):
+    """Remove the pooled client for key, if any, closing it unless held.
+
+    Args:
+        key: key the client was pooled under
+        client: optional, only discard the pooled client if it is this one,
+            rather than a newer client pooled under the same key since
+    """
+    with _lock:
+        entry = _clients.get(key)
+        if entry is None or (client is not None and entry[0] is not client):
+            return
+        del _clients[key]
+        unused = _unused([entry[0]])
+    for stale in unused:
+        _close(stale)
+
+
+def close_all():
+    """Close every pooled or held connection."""
+    with _lock:
+        clients = [client for client, _ in _clients.values()]
+        clients.extend(client for client in _holders if not _pooled(client))
+        _clients.clear()
+        _holders.clear()
+    for client in clients:
+        _close(client)
+
+
+atexit.register(close_all)
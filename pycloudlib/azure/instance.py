@@ -223,6 +223,7 @@ class AzureInstance(BaseInstance):
     # pylint: disable=broad-except
     def delete(self, wait=True) -> List[Exception]:
         """Delete instance."""
+        self._drop_ssh_connection()
         if self._status == VMInstanceStatus.DELETED:
             return []
         try:
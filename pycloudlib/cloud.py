@@ -8,9 +8,11 @@ import logging
 import os
 import re
 from abc import ABC, abstractmethod
-from typing import Any, List, MutableMapping, Optional, Sequence
+from typing import Any, List, MutableMapping, Optional, Sequence, Tuple
 
 import paramiko
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
 
 from pycloudlib.config import ConfigFile, parse_config
 from pycloudlib.errors import (
@@ -38,6 +40,30 @@ class ImageType(enum.Enum):
     PRO_FIPS = "Pro FIPS"
 
 
+def _rsa_key_pair() -> Tuple[str, str]:
+    key = paramiko.RSAKey.generate(4096)
+    priv_str = io.StringIO()
+
+    pub_key = "{} {}".format(key.get_name(), key.get_base64())
+    key.write_private_key(priv_str, password=None)
+
+    return pub_key, priv_str.getvalue()
+
+
+def _ed25519_key_pair() -> Tuple[str, str]:
+    key = ed25519.Ed25519PrivateKey.generate()
+    pub_key = key.public_key().public_bytes(
+        serialization.Encoding.OpenSSH, serialization.PublicFormat.OpenSSH
+    )
+    priv_key = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.OpenSSH,
+        serialization.NoEncryption(),
+    )
+
+    return pub_key.decode(), priv_key.decode()
+
+
 class BaseCloud(ABC):
     """Base Cloud Class."""
 
@@ -210,15 +236,26 @@ class BaseCloud(ABC):
         To ensure cleanup isn't interrupted, any exceptions raised during
         cleanup operations will be collected and returned.
         """
-        exceptions: List[Exception] = []
-        for instance in self.created_instances:
+        exceptions = self._delete_created_instances()
+        for image_id in self.created_images:
             try:
-                instance.delete()
+                self.delete_image(image_id)
             except Exception as e:
                 exceptions.append(e)
-        for image_id in self.created_images:
+        return exceptions
+
+    def _delete_created_instances(self) -> List[Exception]:
+        """Delete the instances created by this Cloud instance, for clean.
+
+        Clouds able to delete instances concurrently may override this.
+
+        Returns:
+            A list of exceptions that occurred during deletion.
+        """
+        exceptions: List[Exception] = []
+        for instance in self.created_instances:
             try:
-                self.delete_image(image_id)
+                instance.delete()
             except Exception as e:
                 exceptions.append(e)
         return exceptions
@@ -232,19 +269,23 @@ class BaseCloud(ABC):
         """
         raise NotImplementedError
 
-    def create_key_pair(self):
+    def create_key_pair(self, *, key_type: str = "rsa"):
         """Create and set a ssh key pair for a cloud instance.
 
+        Args:
+            key_type: type of the key, "rsa" (the default) or "ed25519".
+                Ed25519 keys are generated almost instantly, unlike 4096 bit
+                RSA keys, which take up to seconds, but aren't accepted
+                everywhere, e.g. by sshd in FIPS mode.
+
         Returns:
             A tuple containing the public and private key created
         """
-        key = paramiko.RSAKey.generate(4096)
-        priv_str = io.StringIO()
-
-        pub_key = "{} {}".format(key.get_name(), key.get_base64())
-        key.write_private_key(priv_str, password=None)
-
-        return pub_key, priv_str.getvalue()
+        if key_type == "rsa":
+            return _rsa_key_pair()
+        if key_type == "ed25519":
+            return _ed25519_key_pair()
+        raise ValueError(f"Unsupported key type: {key_type}")
 
     def use_key(self, public_key_path, private_key_path=None, name=None):
         """Use an existing key.
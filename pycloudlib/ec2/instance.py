@@ -187,6 +187,7 @@ class EC2Instance(BaseInstance):
     # pylint: disable=broad-except
     def delete(self, wait=True) -> List[Exception]:
         """Delete instance."""
+        self._drop_ssh_connection()
         exceptions = []
         # Even with DeleteOnTermination set True, nics can outlive instances
         for ip in self.created_interfaces[:]:
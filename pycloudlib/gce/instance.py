@@ -108,6 +108,7 @@ class GceInstance(BaseInstance):
         Args:
             wait: wait for instance to be deleted
         """
+        self._drop_ssh_connection()
         if not self.instance_id:
             return []
         try:
@@ -2,7 +2,8 @@
 """Private utilities for IBM cloud."""
 
 from functools import partial
-from time import sleep
+from itertools import count
+from time import monotonic, sleep
 from typing import Callable, Iterator, Optional
 
 from ibm_vpc import DetailedResponse
@@ -60,13 +61,32 @@ def wait_until(
     timeout_seconds: int,
     timeout_msg_fn: Callable[..., str],
     raise_on_fail: bool = True,
-    check_interval: int = 1,
+    check_interval: float = 1,
+    deadline: Optional[float] = None,
+    max_check_interval: Optional[float] = None,
 ) -> bool:
-    """Wait `timeout_seconds` until `check_fn` evaluates to true."""
-    for _ in range(timeout_seconds):
+    """Wait `timeout_seconds` until `check_fn` evaluates to true.
+
+    If `deadline`, a `time.monotonic()` timestamp, is given, it supersedes
+    `timeout_seconds`: waiting stops as soon as the deadline is reached.
+    This allows several consecutive waits to share a single time budget.
+
+    If `max_check_interval` is given, the interval between checks doubles
+    after every failed check, starting at `check_interval` and capped at
+    `max_check_interval`. As the number of checks is then no longer tied
+    to the elapsed time, `timeout_seconds` is enforced as a deadline.
+    """
+    if max_check_interval is not None and deadline is None:
+        deadline = monotonic() + timeout_seconds
+    attempts = range(timeout_seconds) if deadline is None else count()
+    for _ in attempts:
+        if deadline is not None and monotonic() >= deadline:
+            break
         if check_fn(*args) is True:
             return True
         sleep(check_interval)
+        if max_check_interval is not None:
+            check_interval = min(check_interval * 2, max_check_interval)
     if raise_on_fail:
         raise PycloudlibTimeoutError(timeout_msg_fn())
     return False
@@ -822,6 +822,7 @@ class IBMInstance(BaseInstance):
         Args:
             wait: wait for instance to be deleted
         """
+        self._drop_ssh_connection()
         exceptions = []
         try:
             self._delete_instance(self.id)
@@ -2,6 +2,7 @@
 """IBM Cloud type."""
 
 import re
+from concurrent.futures import as_completed
 from typing import List, Literal, Optional, Tuple
 
 import SoftLayer  # type: ignore
@@ -478,6 +479,32 @@ class IBMClassic(BaseCloud):
                 exceptions.append(e)
         return exceptions
 
+    def _delete_created_instances(self) -> List[Exception]:
+        """Delete the instances created by this Cloud instance, for clean.
+
+        Instances are deleted concurrently: each deletion may have to wait
+        for active transactions to finish.
+
+        Returns:
+            A list of exceptions that occurred during deletion.
+        """
+        exceptions: List[Exception] = []
+        futures = []
+        for instance in self.created_instances:
+            try:
+                if isinstance(instance, IBMClassicInstance):
+                    futures.append(instance.delete_async())
+                else:
+                    instance.delete()
+            except Exception as e:
+                exceptions.append(e)
+        for future in as_completed(futures):
+            try:
+                exceptions.extend(future.result())
+            except Exception as e:
+                exceptions.append(e)
+        return exceptions
+
     @staticmethod
     def _validate_tag(tag: str):
         """
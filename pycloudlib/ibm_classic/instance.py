@@ -3,16 +3,28 @@
 """IBM Classic instance class."""
 
 import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Optional
 
 import SoftLayer  # type: ignore
 
+from pycloudlib.errors import PycloudlibTimeoutError
 from pycloudlib.ibm._util import wait_until as _wait_until
 from pycloudlib.ibm_classic.errors import IBMClassicException
 from pycloudlib.instance import BaseInstance
 
 logger = logging.getLogger(__name__)
 
+# Deleting an instance may block for up to an hour waiting for active
+# transactions to finish, so fleets of instances are deleted concurrently
+# through this shared pool (threads are only spawned on first use).
+_DELETE_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="ibm-classic-delete")
+
+# Power state changes are polled with an exponential backoff: quick
+# transitions are noticed early while long ones don't flood the API.
+_MAX_POWER_STATE_CHECK_INTERVAL = 30
+
 
 class IBMClassicInstance(BaseInstance):
     """IBM Classic instance class."""
@@ -34,6 +46,7 @@ class IBMClassicInstance(BaseInstance):
         self._softlayer_client = softlayer_client
         self._vs_manager = vs_manager
         self._instance = instance
+        self._ip: Optional[str] = instance.get("primaryIpAddress")
         self._deleted = False
 
         if username:
@@ -55,14 +68,15 @@ class IBMClassicInstance(BaseInstance):
     @property
     def ip(self):
         """Return IP address of instance."""
-        # update instance info if IP address was not previously available
-        if "primaryIpAddress" not in self._instance:
+        if self._ip is None:
+            # update instance info if IP address was not previously available
             self._instance = self._vs_manager.get_instance(self.id)
+            self._ip = self._instance.get("primaryIpAddress")
         # if IP address is still not available, raise exception
-        if "primaryIpAddress" not in self._instance:
+        if self._ip is None:
             raise IBMClassicException(f"Failed to get IP address for instance {self.id}")
 
-        return self._instance["primaryIpAddress"]
+        return self._ip
 
     @staticmethod
     def create_raw_instance(
@@ -147,11 +161,13 @@ class IBMClassicInstance(BaseInstance):
         """
         raise NotImplementedError("Console log not supported for IBM Classic")
 
-    def delete(self, wait=True) -> List[Exception]:
+    def delete(self, wait=True, timeout: float = 70 * 60) -> List[Exception]:
         """Delete the instance.
 
         Args:
             wait: wait for instance to be deleted
+            timeout: overall time budget in seconds for all the waits
+                involved in deleting the instance when `wait` is True
         """
 
         def has_no_active_transaction():
@@ -169,6 +185,7 @@ class IBMClassicInstance(BaseInstance):
                     "Deleting instance %s and waiting for it to delete.",
                     self.name,
                 )
+                deadline = time.monotonic() + timeout
                 instance = self._vs_manager.get_instance(self.id)
                 if "activeTransaction" in instance:
                     at = instance["activeTransaction"]
@@ -185,12 +202,20 @@ class IBMClassicInstance(BaseInstance):
                         timeout_seconds=60 * 60,
                         timeout_msg_fn=lambda: msg,
                         check_interval=5,
+                        deadline=deadline,
                     )
-                    self._wait_for_execute()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PycloudlibTimeoutError(
+                            f"Instance {self.name} failed to delete after {timeout} seconds"
+                        )
+                    self._wait_for_execute(deadline=deadline)
+                self._drop_ssh_connection()
                 self._vs_manager.cancel_instance(self.id)
-                self.wait_for_delete()
+                self.wait_for_delete(deadline=deadline)
             else:
                 logger.info("Deleting instance %s without waiting.")
+                self._drop_ssh_connection()
                 self._vs_manager.cancel_instance(self.id)
         except Exception as e:  # pylint: disable=broad-except
             return [e]
@@ -198,6 +223,18 @@ class IBMClassicInstance(BaseInstance):
         self._deleted = True
         return []
 
+    def delete_async(self, wait=True, **kwargs) -> Future:
+        """Delete the instance in a background thread.
+
+        Args:
+            wait: wait for instance to be deleted
+            **kwargs: passed through to delete()
+
+        Returns:
+            A future resolving to the list of exceptions returned by delete()
+        """
+        return _DELETE_POOL.submit(self.delete, wait=wait, **kwargs)
+
     def _do_restart(self, **kwargs):
         self._softlayer_client.call("Virtual_Guest", "rebootSoft", id=self.id)
 
@@ -245,32 +282,7 @@ class IBMClassicInstance(BaseInstance):
         """Wait for the cloud instance to be up."""
 
         def is_started():
-            instance = self._vs_manager.get_instance(self.id)
-            power_state = instance.get("powerState", {}).get("keyName")
-            last_transaction = (
-                instance.get("lastTransaction", {}).get("transactionStatus", {}).get("name")
-            )
-            is_active_transaction = "activeTransaction" in instance
-            logger.debug(
-                "Instance %s powerState: %s",
-                self.name,
-                power_state,
-            )
-            logger.debug(
-                "Instance %s lastTransaction: %s",
-                self.name,
-                last_transaction,
-            )
-            logger.debug(
-                "Instance %s activeTransaction: %s",
-                self.name,
-                is_active_transaction,
-            )
-            return (
-                power_state == "RUNNING"
-                and last_transaction == "COMPLETE"
-                and not is_active_transaction
-            )
+            return self._has_settled_in_power_state("RUNNING")
 
         # wait for 3 hours for the instance to start
         timeout = 60 * 60 * 3
@@ -280,10 +292,37 @@ class IBMClassicInstance(BaseInstance):
             is_started,
             timeout_seconds=timeout,
             timeout_msg_fn=lambda: msg,
-            check_interval=10,
+            check_interval=1,
+            max_check_interval=_MAX_POWER_STATE_CHECK_INTERVAL,
         )
         logger.info("Instance %s started", self.name)
         self._instance = self._vs_manager.get_instance(self.id)
+        # resolve the IP address once here, so the SSH connection attempts
+        # that follow don't trigger additional API calls
+        self._ip = self._instance.get("primaryIpAddress")
+        if self._ip is None:
+            logger.warning("Instance %s started without a primary IP address", self.name)
+
+    def _has_settled_in_power_state(self, power_state: str) -> bool:
+        """Check if instance is in `power_state` with no pending transaction."""
+        instance = self._vs_manager.get_instance(self.id)
+        current_power_state = instance.get("powerState", {}).get("keyName")
+        last_transaction = (
+            instance.get("lastTransaction", {}).get("transactionStatus", {}).get("name")
+        )
+        is_active_transaction = "activeTransaction" in instance
+        logger.debug(
+            "Instance %s powerState: %s, lastTransaction: %s, activeTransaction: %s",
+            self.name,
+            current_power_state,
+            last_transaction,
+            is_active_transaction,
+        )
+        return (
+            current_power_state == power_state
+            and last_transaction == "COMPLETE"
+            and not is_active_transaction
+        )
 
     def wait(self, **kwargs):
         """Wait for instance to be up and cloud-init to be complete."""
@@ -302,13 +341,26 @@ class IBMClassicInstance(BaseInstance):
         self._wait_for_execute(old_boot_id=old_boot_id, timeout=15)
         self._wait_for_cloudinit()
 
-    def wait_for_delete(self, **kwargs):
-        """Wait for instance to be deleted."""
+    def wait_for_delete(self, deadline: Optional[float] = None, **kwargs):
+        """Wait for instance to be deleted.
 
-        # we need to wait until the instance is deleted
+        Args:
+            deadline: optional `time.monotonic()` timestamp after which to
+                stop waiting, superseding the default timeout
+        """
+
+        # we need to wait until the instance is deleted. Query this instance
+        # only, rather than listing every instance in the account.
         def is_deleted():
-            existing_instances = self._vs_manager.list_instances()
-            return self.id not in [instance["id"] for instance in existing_instances]
+            try:
+                self._softlayer_client.call(
+                    "Virtual_Guest", "getObject", id=self.id, mask="mask[id]"
+                )
+            except SoftLayer.SoftLayerAPIError as e:
+                if e.faultCode == "SoftLayer_Exception_ObjectNotFound":
+                    return True
+                raise
+            return False
 
         # wait for 10 minutes for the instance to delete
         timeout = 60 * 10
@@ -319,6 +371,7 @@ class IBMClassicInstance(BaseInstance):
             timeout_seconds=timeout,
             timeout_msg_fn=lambda: msg,
             check_interval=5,
+            deadline=deadline,
         )
         logger.info("Instance %s deleted", self.name)
 
@@ -326,32 +379,7 @@ class IBMClassicInstance(BaseInstance):
         """Wait for instance stop."""
 
         def is_stopped():
-            instance = self._vs_manager.get_instance(self.id)
-            power_state = instance.get("powerState", {}).get("keyName")
-            last_transaction = (
-                instance.get("lastTransaction", {}).get("transactionStatus", {}).get("name")
-            )
-            is_active_transaction = "activeTransaction" in instance
-            logger.debug(
-                "Instance %s powerState: %s",
-                self.name,
-                power_state,
-            )
-            logger.debug(
-                "Instance %s lastTransaction: %s",
-                self.name,
-                last_transaction,
-            )
-            logger.debug(
-                "Instance %s activeTransaction: %s",
-                self.name,
-                is_active_transaction,
-            )
-            return (
-                power_state == "HALTED"
-                and last_transaction == "COMPLETE"
-                and not is_active_transaction
-            )
+            return self._has_settled_in_power_state("HALTED")
 
         # wait for 10 minutes for the instance to stop
         timeout = 60 * 10
@@ -361,6 +389,7 @@ class IBMClassicInstance(BaseInstance):
             is_stopped,
             timeout_seconds=timeout,
             timeout_msg_fn=lambda: msg,
-            check_interval=5,
+            check_interval=1,
+            max_check_interval=_MAX_POWER_STATE_CHECK_INTERVAL,
         )
         logger.info("Instance %s stopped", self.name)
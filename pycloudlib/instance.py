@@ -2,37 +2,131 @@
 # pylint: disable=too-many-public-methods
 """Base class for all instances to provide consistent set of functions."""
 
+import asyncio
+import functools
 import logging
+import os
+import socket
+import threading
 import time
+import uuid
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import paramiko
 from paramiko.ssh_exception import (
     AuthenticationException,
     BadHostKeyException,
     NoValidConnectionsError,
-    PasswordRequiredException,
     SSHException,
 )
 
+from pycloudlib import _ssh, _ssh_pool
 from pycloudlib.errors import CleanupError, PycloudlibTimeoutError
 from pycloudlib.result import Result
-from pycloudlib.util import log_exception_list, shell_pack, shell_quote
+from pycloudlib.util import backoff_delay, log_exception_list, shell_quote
+
+# Flow control window and packet size of SFTP channels. The window is large
+# enough to keep links with a high bandwidth-delay product busy, and the
+# packet size is OpenSSH's upper limit.
+_SFTP_WINDOW_SIZE = 64 * 1024 * 1024
+_SFTP_MAX_PACKET_SIZE = 256 * 1024
+
+# Commands run concurrently by execute_many, below sshd's default limit of
+# 10 sessions per connection
+_MAX_CONCURRENT_CHANNELS = 8
+_BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+# Fixed commands run by install, update and clean, quoted once
+# Failing to update the package lists doesn't keep the commands following
+# from running, as when the update was run separately: it is reported on
+# stderr instead.
+_APT_UPDATE_FAILED = "pycloudlib: apt-get update failed"
+_APT_UPDATE = shell_quote(["sudo", "apt-get", "update"]) + (
+    f" || echo {shell_quote(_APT_UPDATE_FAILED)} >&2"
+)
+_APT_INSTALL = shell_quote(
+    ["DEBIAN_FRONTEND=noninteractive", "sudo", "apt-get", "install", "--yes"]
+)
+_APT_UPGRADE = shell_quote(
+    ["DEBIAN_FRONTEND=noninteractive", "sudo", "apt-get", "--yes", "upgrade"]
+)
+# Output of install when there is nothing to install
+_ALL_PACKAGES_INSTALLED = "All packages are already installed"
+# Template of the check exiting install early, given the quoted packages and
+# their number
+_ALL_INSTALLED_CHECK = (
+    "if [ \"$(dpkg-query -W -f='${Status}\\n' %s 2>/dev/null"
+    " | grep -c '^install ok installed$')\" -eq %d ]; then"
+    f" echo {shell_quote(_ALL_PACKAGES_INSTALLED)}; exit 0; fi"
+)
+_CLEAN_COMMANDS = (
+    "sudo cloud-init clean --logs",
+    "sudo echo 'uninitialized' > /etc/machine-id",
+    "sudo rm -rf /var/log/syslog",
+)
+# Seconds during which package lists updated by install or update are
+# considered fresh enough not to update them again
+_APT_LISTS_MAX_AGE = 10 * 60
+
+# Keep paramiko's debug output, which logs every packet, out of our logs
+logging.getLogger("paramiko").setLevel(logging.INFO)
+
+# Wait until cloud-init has finished. We may have issues with cloud-init
+# status early boot, so on systems using systemd first wait for up to 300
+# seconds for cloud-init.target to be active, as an extra layer of
+# protection against connecting before the system is ready. Polling happens
+# on the instance itself rather than paying a round-trip per check.
+_WAIT_FOR_CLOUDINIT = (
+    "if command -v systemctl >/dev/null; then i=0; "
+    "until systemctl is-active --quiet cloud-init.target"
+    ' || [ "$i" -ge 300 ]; do i=$((i + 1)); sleep 1; done; fi; '
+    "cloud-init status --wait --long"
+)
+
+
+class _LazyQuote:
+    """Shell quote a command only once it actually gets logged."""
+
+    __slots__ = ("_command", "_quoted")
+
+    def __init__(self, command):
+        self._command = command
+        self._quoted = None
+
+    def __str__(self):
+        if self._quoted is None:
+            self._quoted = shell_quote(self._command)
+        return self._quoted
 
 
 class BaseInstance(ABC):
     """Base instance object."""
 
     _type = "base"
+    # Whether waiting for the instance to start and to be reachable can
+    # overlap. Only enabled where reaching an instance doesn't need extra
+    # API calls, e.g. to look up its address, or a reboot which is part of
+    # starting it.
+    _overlap_start_and_execute = False
 
     def __init__(self, key_pair, username: Optional[str] = None):
         """Set up instance."""
         self._log = logging.getLogger(__name__)
         self._ssh_client = None
+        self._ssh_pool_key: Optional[Tuple[str, str, int, str]] = None
         self._sftp_client = None
+        self._shell_channel = None
+        # Serializes connecting and use of the persistent shell between
+        # threads executing commands concurrently
+        self._ssh_lock = threading.RLock()
+        self._pkey = None
+        self._pkey_loaded = False
         self._tmp_count = 0
+        # When the package lists were last updated by install or update,
+        # reset by any other command run or restart
+        self._apt_updated_at: Optional[float] = None
 
         self.boot_timeout = 120
         self.key_pair = key_pair
@@ -40,6 +134,16 @@ class BaseInstance(ABC):
         self.username = username or "ubuntu"
         self.connect_timeout = 60
         self.banner_timeout = 60
+        self.auth_timeout = 30
+        # Interval in seconds between SSH keepalive packets. Keeps the
+        # connection from being silently dropped by NAT or firewalls
+        # between commands.
+        self.keepalive_interval = 30
+        # Run commands through a single long-lived remote shell rather than
+        # opening a new SSH channel for each of them
+        self.persistent_shell = False
+        # Number of SFTP read requests kept in flight when pulling files
+        self.max_concurrent_requests = 64
 
     def __enter__(self):
         """Enter context manager for this class."""
@@ -47,7 +151,10 @@ class BaseInstance(ABC):
 
     def __exit__(self, _type, _value, _traceback):
         """Exit context manager for this class."""
-        exceptions = self.delete()
+        try:
+            exceptions = self.delete()
+        finally:
+            self.close()
         log_exception_list(exceptions)
         if exceptions:
             raise CleanupError(exceptions)
@@ -76,7 +183,28 @@ class BaseInstance(ABC):
         Returns:
             string with the boot UUID
         """
-        result = self.execute("cat /proc/sys/kernel/random/boot_id", no_log=True)
+        # Reuse an open SFTP session when there is one, rather than starting
+        # a command on a new channel
+        sftp = self._sftp_client
+        if sftp is not None:
+            try:
+                with sftp.open(_BOOT_ID_PATH, "rb") as boot_id:
+                    return Result(boot_id.read().decode("utf-8").strip(), "", 0)
+            except (OSError, EOFError, SSHException):
+                self._sftp_client = None
+        return self._check_boot_id(self.execute(["cat", _BOOT_ID_PATH], no_log=True))
+
+    def _sync_and_get_boot_id(self):
+        """Sync the filesystem and get the instance boot_id in one command.
+
+        Returns:
+            string with the boot UUID
+        """
+        return self._check_boot_id(self.execute(f"sync; cat {_BOOT_ID_PATH}", no_log=True))
+
+    @staticmethod
+    def _check_boot_id(result):
+        """Return the result of reading the boot_id, raising if it failed."""
         if result.failed:
             raise OSError(
                 f"Failed to get boot_id. Return code: {result.return_code}, "
@@ -103,9 +231,10 @@ class BaseInstance(ABC):
 
     def restart(self, wait=True, **kwargs):
         """Restart an instance."""
-        self._sync_filesystem()
+        self._apt_updated_at = None
         # If we're not waiting, just call subclass's restart and return.
         if not wait:
+            self._sync_filesystem()
             self._do_restart(**kwargs)
             return
 
@@ -113,8 +242,9 @@ class BaseInstance(ABC):
 
         # If we attempt to restart, but the instance is already in a
         # non-connectable state, then don't check boot ids.
+        # Sync the filesystem in the same round-trip as getting the boot id
         try:
-            pre_boot_id = self.get_boot_id()
+            pre_boot_id = self._sync_and_get_boot_id()
         except (SSHException, OSError):
             # Case 2: wait=True, but the instance is unreachable.
             # The best we can do is to send a reboot signal and wait.
@@ -162,8 +292,7 @@ class BaseInstance(ABC):
 
     def wait(self, **kwargs):
         """Wait for instance to be up and cloud-init to be complete."""
-        self._wait_for_instance_start(**kwargs)
-        self._wait_for_execute()
+        self._wait_for_start_and_execute(**kwargs)
         self._wait_for_cloudinit()
 
     def wait_for_restart(self, old_boot_id):
@@ -171,10 +300,45 @@ class BaseInstance(ABC):
 
         old_boot_id is the boot id prior to restart
         """
-        self._wait_for_instance_start()
-        self._wait_for_execute(old_boot_id=old_boot_id)
+        self._wait_for_start_and_execute(old_boot_id=old_boot_id)
         self._wait_for_cloudinit()
 
+    def _wait_for_start_and_execute(self, old_boot_id=None, **kwargs):
+        """Wait for the instance to start and for commands to be executable.
+
+        Instances are often reachable before the cloud reports them as
+        started, so we start trying to reach the instance in a thread while
+        waiting for it to start.
+
+        Args:
+            old_boot_id: boot id before restart, passed to _wait_for_execute
+            kwargs: passed to _wait_for_instance_start
+        """
+        if not self._overlap_start_and_execute:
+            self._wait_for_instance_start(**kwargs)
+            self._wait_for_execute(old_boot_id=old_boot_id)
+            return
+
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            probe = executor.submit(self._wait_for_execute, old_boot_id=old_boot_id, stop=stop)
+            try:
+                self._wait_for_instance_start(**kwargs)
+            except BaseException:
+                stop.set()
+                raise
+            failed_before_start = probe.done()
+            try:
+                probe.result()
+            except Exception as e:  # pylint: disable=broad-except
+                # Reaching the instance may fail in unexpected ways before
+                # it has started, e.g. while it has no IP address yet, or
+                # even time out looking it up: only later timeouts are final
+                if isinstance(e, PycloudlibTimeoutError) and not failed_before_start:
+                    raise
+                self._log.debug("Failed to reach instance while starting: %s", e)
+                self._wait_for_execute(old_boot_id=old_boot_id)
+
     @abstractmethod
     def wait_for_delete(self, **kwargs):
         """Wait for instance to be deleted."""
@@ -193,20 +357,63 @@ class BaseInstance(ABC):
         """Remove nic from running instance."""
         raise NotImplementedError
 
-    def __del__(self):
-        """Cleanup of instance."""
+    def close(self):
+        """Close the SFTP connection and release the SSH connection.
+
+        SSH connections are shared through a process-wide pool, so they are
+        left open for reuse and closed when the interpreter exits.
+        Connections are re-established on demand, so the instance remains
+        usable after calling this.
+        """
+        if self._shell_channel:
+            with suppress(SSHException, OSError):
+                self._shell_channel.close()
+            self._shell_channel = None
         if self._sftp_client:
             try:
                 self._sftp_client.close()
             except SSHException:
                 self._log.warning("Failed to close SFTP connection.")
             self._sftp_client = None
-        if self._ssh_client:
-            try:
-                self._ssh_client.close()
-            except SSHException:
-                self._log.warning("Failed to close SSH connection.")
-            self._ssh_client = None
+        self._release_ssh_client()
+
+    def _release_ssh_client(self):
+        """Stop using the SSH connection, leaving it pooled for reuse."""
+        client, self._ssh_client = self._ssh_client, None
+        if client:
+            _ssh_pool.release(client)
+
+    def _discard_ssh_client(self, client):
+        """Forget a failed SSH connection and drop it from the pool.
+
+        A newer connection pooled for the same machine since is kept.
+        """
+        if self._ssh_pool_key:
+            _ssh_pool.discard(self._ssh_pool_key, client)
+        if self._ssh_client is client:
+            self._release_ssh_client()
+
+    def _drop_ssh_connection(self):
+        """Close the connections to an instance being deleted.
+
+        The pooled SSH connection is closed as well: the address of the
+        instance may be reused by another one, which mustn't be handed it.
+        """
+        self.close()
+        if self._ssh_pool_key:
+            _ssh_pool.discard(self._ssh_pool_key)
+            self._ssh_pool_key = None
+
+    def __del__(self):
+        """Cleanup of instance.
+
+        Prefer calling close() explicitly: this is only a fallback, which
+        may run late or during interpreter shutdown.
+        """
+        try:
+            self.close()
+        except Exception:  # pylint: disable=broad-except
+            pass
 
     def clean(self):
         """Clean an instance to make it look prestine.
@@ -220,9 +427,7 @@ class BaseInstance(ABC):
         # bionic-pro cloud images.
         #
         # [1] https://github.com/canonical/cloud-init/commit/abfdf1d83995cc20e
-        self.execute("sudo cloud-init clean --logs")
-        self.execute("sudo echo 'uninitialized' > /etc/machine-id")
-        self.execute("sudo rm -rf /var/log/syslog")
+        self.execute_batch(_CLEAN_COMMANDS, stop_on_error=False)
 
     def _run_command(self, command, stdin, get_pty=False):
         """Run command in the instance."""
@@ -257,19 +462,121 @@ class BaseInstance(ABC):
         Raises SSHException if there are any problem with the ssh connection
 
         """
+        command = self._prepare_command(command, description, use_sudo=use_sudo, no_log=no_log)
+        return self._run_command(command, stdin, **kwargs)
+
+    def _prepare_command(self, command, description=None, *, use_sudo=False, no_log=False):
+        """Return the argv of a command to execute, logging it.
+
+        Args:
+            command: the command to execute, as accepted by `execute`
+            description: purpose of command
+            use_sudo: boolean to run the command as sudo
+            no_log: boolean to not log the command
+
+        Returns:
+            list of the command arguments
+        """
+        # The command may change the apt sources, e.g. adding a PPA: update
+        # the package lists again before installing from them
+        self._apt_updated_at = None
         if isinstance(command, str):
             command = ["sh", "-c", command]
         if use_sudo:
             command = ["sudo", "--"] + command
 
         if not no_log:
-            self._log.info("executing: %s", shell_quote(command))
+            quoted = _LazyQuote(command)
+            self._log.info("executing: %s", quoted)
             if description:
                 self._log.debug(description)
             else:
-                self._log.debug("executing: %s", shell_quote(command))
+                self._log.debug("executing: %s", quoted)
+        return command
 
-        return self._run_command(command, stdin, **kwargs)
+    def _run_commands(self, commands):
+        """Run independent commands in the instance concurrently.
+
+        Each command runs on its own channel of the SSH connection, so
+        their round-trips overlap.
+        """
+        results: List[Result] = []
+        for start in range(0, len(commands), _MAX_CONCURRENT_CHANNELS):
+            channels = []
+            try:
+                for command in commands[start : start + _MAX_CONCURRENT_CHANNELS]:
+                    channels.append(self._ssh_submit(_ssh.pack_command(tuple(command))))
+            except SSHException:
+                for channel in channels:
+                    channel.close()
+                raise
+            results.extend(_ssh.collect_results(channels))
+        return results
+
+    def execute_many(self, commands, *, use_sudo=False, no_log=False) -> List[Result]:
+        """Execute independent commands in instance concurrently.
+
+        Args:
+            commands: list of commands to execute, as accepted by `execute`
+            use_sudo: boolean to run the commands as sudo
+            no_log: boolean to not log the commands
+
+        Returns:
+            list of the Result of each command, in the order of commands
+
+        Raises SSHException if there are any problem with the ssh connection
+        """
+        return self._run_commands(
+            [
+                self._prepare_command(command, use_sudo=use_sudo, no_log=no_log)
+                for command in commands
+            ]
+        )
+
+    async def execute_async(self, command, *args, **kwargs):
+        """Execute command in instance without blocking the event loop.
+
+        The command runs in a worker thread on its own channel of the
+        instance's SSH connection, so several commands can be awaited
+        concurrently.
+
+        Args:
+            command: command to execute, as accepted by `execute`
+            args: passed through to `execute`
+            kwargs: passed through to `execute`
+
+        Returns:
+            Result object
+
+        Raises SSHException if there are any problem with the ssh connection
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.execute, command, *args, **kwargs)
+        )
+
+    def execute_batch(self, commands, description=None, *, stop_on_error=True, **kwargs):
+        """Execute several commands in the instance in a single round-trip.
+
+        Args:
+            commands: list of commands to execute. Commands given as lists
+                      are quoted, while strings are run as shell code.
+            description: purpose of the commands
+            stop_on_error: boolean to stop at the first failing command.
+                           Otherwise every command is run and the result
+                           of the last one is returned.
+            kwargs: passed through to `execute`
+
+        Returns:
+            Result object of the combined commands
+
+        Raises SSHException if there are any problem with the ssh connection
+        """
+        separator = " && " if stop_on_error else "; "
+        script = separator.join(
+            command if isinstance(command, str) else shell_quote(command) for command in commands
+        )
+        return self.execute(["sh", "-c", script], description=description, **kwargs)
 
     def install(self, packages):
         """Install specific packages.
@@ -278,22 +585,39 @@ class BaseInstance(ABC):
             packages: string or list of package(s) to install
 
         Returns:
-            result from install
+            result from install, which is successful without doing anything
+            if all packages are already installed
 
         """
         if isinstance(packages, str):
             packages = packages.split(" ")
 
-        self.execute(["sudo", "apt-get", "update"])
-        return self.execute(
-            [
-                "DEBIAN_FRONTEND=noninteractive",
-                "sudo",
-                "apt-get",
-                "install",
-                "--yes",
-            ]
-            + packages
+        # Skip updating the package lists and installing altogether when
+        # every package is already installed
+        all_installed = _ALL_INSTALLED_CHECK % (shell_quote(packages), len(packages))
+        update_lists = self._apt_lists_stale()
+        updated_at = self._apt_updated_at
+        result = self.execute_batch(
+            [all_installed]
+            + ([_APT_UPDATE] if update_lists else [])
+            + [f"{_APT_INSTALL} {shell_quote(packages)}"]
+        )
+        # Installing packages leaves the apt sources unchanged
+        self._apt_updated_at = updated_at
+        if update_lists and result != _ALL_PACKAGES_INSTALLED:
+            self._apt_lists_updated(result)
+        return result
+
+    def _apt_lists_updated(self, result: Result):
+        """Record the package lists as fresh if updating them succeeded."""
+        if result.ok and _APT_UPDATE_FAILED not in result.stderr:
+            self._apt_updated_at = time.monotonic()
+
+    def _apt_lists_stale(self) -> bool:
+        """Return whether the package lists should be updated before use."""
+        return (
+            self._apt_updated_at is None
+            or time.monotonic() - self._apt_updated_at > _APT_LISTS_MAX_AGE
         )
 
     def pull_file(self, remote_path, local_path):
@@ -308,7 +632,11 @@ class BaseInstance(ABC):
         self._log.debug("pulling file %s to %s", remote_path, local_path)
 
         sftp = self._sftp_connect()
-        sftp.get(remote_path, local_path)
+        with sftp.open(remote_path, "rb") as remote_file, open(local_path, "wb") as local_file:
+            # Keep many read requests in flight rather than waiting a full
+            # round-trip for each one
+            _ssh.prefetch(remote_file, self.max_concurrent_requests)
+            _ssh.copy_file(remote_file, local_file)
 
     def push_file(self, local_path, remote_path):
         """Copy file at 'local_path' to instance at 'remote_path'.
@@ -322,7 +650,10 @@ class BaseInstance(ABC):
         self._log.debug("pushing file %s to %s", local_path, remote_path)
 
         sftp = self._sftp_connect()
-        sftp.put(local_path, remote_path)
+        with open(local_path, "rb") as local_file, sftp.open(remote_path, "wb") as remote_file:
+            # Don't wait for the server to acknowledge each write
+            remote_file.set_pipelined(True)
+            _ssh.copy_file(local_file, remote_file)
 
     def run_script(self, script, description=None):
         """Run script in target and return stdout.
@@ -361,16 +692,14 @@ class BaseInstance(ABC):
             result from upgrade
 
         """
-        self.execute(["sudo", "apt-get", "update"])
-        return self.execute(
-            [
-                "DEBIAN_FRONTEND=noninteractive",
-                "sudo",
-                "apt-get",
-                "--yes",
-                "upgrade",
-            ]
-        )
+        update_lists = self._apt_lists_stale()
+        updated_at = self._apt_updated_at
+        result = self.execute_batch(([_APT_UPDATE] if update_lists else []) + [_APT_UPGRADE])
+        # Upgrading packages leaves the apt sources unchanged
+        self._apt_updated_at = updated_at
+        if update_lists:
+            self._apt_lists_updated(result)
+        return result
 
     def _ssh(self, command, stdin=None, get_pty=False):
         """Run a command via SSH.
@@ -384,11 +713,36 @@ class BaseInstance(ABC):
             tuple of stdout, stderr and the return code
 
         """
-        cmd = shell_pack(command)
-        client = self._ssh_connect()
+        if isinstance(command, str):
+            command = [command]
+        cmd = _ssh.pack_command(tuple(command))
+        if self.persistent_shell and stdin is None and not get_pty:
+            return self._ssh_persistent(cmd)
+        return _ssh.collect_results([self._ssh_submit(cmd, stdin=stdin, get_pty=get_pty)])[0]
+
+    def _ssh_submit(self, cmd, stdin=None, get_pty=False):
+        """Start a command via SSH, without waiting for it.
+
+        Args:
+            cmd: shell string of the command to run
+            stdin: optional, values to be passed in
+            get_pty: optional, allocates a pty
+
+        Returns:
+            paramiko.Channel the command runs on
+        """
+        # Connections already established may have been dropped without
+        # their transport noticing yet: reconnect once if one of them fails
+        client, reused = self._get_ssh_client()
         try:
-            fp_in, fp_out, fp_err = client.exec_command(cmd, get_pty=get_pty)
-        except (ConnectionResetError, NoValidConnectionsError, EOFError) as e:
+            fp_in, _, _ = client.exec_command(cmd, get_pty=get_pty)
+        except (SSHException, ConnectionResetError, NoValidConnectionsError, EOFError) as e:
+            self._discard_ssh_client(client)
+            if reused:
+                self._log.debug("Reconnecting after failing to run command: %s", e)
+                return self._ssh_submit(cmd, stdin=stdin, get_pty=get_pty)
+            if isinstance(e, SSHException):
+                raise
             raise SSHException from e
         channel = fp_in.channel
 
@@ -397,73 +751,157 @@ class BaseInstance(ABC):
             fp_in.close()
 
         channel.shutdown_write()
+        return channel
+
+    def _ssh_persistent(self, cmd):
+        """Run a command through the persistent remote shell.
 
-        out = fp_out.read()
-        err = fp_err.read()
-        return_code = channel.recv_exit_status()
+        Avoids the round-trips needed to open, set up and close a channel
+        for every command. The end of the command output is detected with
+        unique markers written once it has exited.
 
-        out = "" if not out else out.rstrip().decode("utf-8")
-        err = "" if not err else err.rstrip().decode("utf-8")
+        Args:
+            cmd: shell string of the command to run
 
-        return Result(out, err, return_code)
+        Returns:
+            Result object
+        """
+        with self._ssh_lock:
+            channel = self._shell_channel
+            if channel is None or channel.closed or channel.exit_status_ready():
+                client = self._ssh_connect()
+                try:
+                    channel = client.get_transport().open_session()
+                    channel.exec_command("sh")
+                except SSHException:
+                    self._discard_ssh_client(client)
+                    raise
+                except (EOFError, OSError) as e:
+                    self._discard_ssh_client(client)
+                    raise SSHException from e
+                self._shell_channel = channel
+
+            marker = f"__pycloudlib_{uuid.uuid4().hex}__"
+            script = (
+                f"( {cmd} ) </dev/null\n"
+                f"printf '\\n{marker}:%d\\n' $?\n"
+                f"printf '\\n{marker}\\n' >&2\n"
+            )
+            try:
+                channel.sendall(script.encode())
+            except (OSError, EOFError) as e:
+                self._shell_channel = None
+                raise SSHException from e
+
+            out_buf = bytearray()
+            err_buf = bytearray()
+            ends = _ssh.drain_until_marker(channel, out_buf, err_buf, marker.encode())
+            if ends is None:
+                self._shell_channel = None
+                raise SSHException("Persistent shell exited unexpectedly")
+
+            out_end, err_end, return_code = ends
+            out = _ssh.decode_output(out_buf, out_end)
+            err = _ssh.decode_output(err_buf, err_end)
+            return Result(out, err, return_code)
 
     def _ssh_connect(self):
         """Connect to instance via SSH."""
-        if self._ssh_client and self._ssh_client.get_transport().is_active():
-            return self._ssh_client
+        return self._get_ssh_client()[0]
 
-        logging.getLogger("paramiko").setLevel(logging.INFO)
-        client = paramiko.SSHClient()
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    def _get_ssh_client(self) -> Tuple[paramiko.SSHClient, bool]:
+        """Connect to instance via SSH, reusing any active connection.
 
-        # Paramiko can barf on valid keys when initializing this way,
-        # so the check here is _only_ for checking if we have a
-        # password protected keyfile. The filename is passed directly
-        # when connecting
-        try:
-            paramiko.RSAKey.from_private_key_file(self.key_pair.private_key_path)
-        except PasswordRequiredException:
-            self._log.warning(
-                "The specified key (%s) requires a passphrase. If you have not"
-                " added this key to a running SSH agent, you will see failures"
-                " to connect after a long timeout.",
+        Returns:
+            tuple of the SSH client, and whether it was already connected
+        """
+        with self._ssh_lock:
+            if self._ssh_client:
+                if _ssh_pool.is_active(self._ssh_client):
+                    return self._ssh_client, True
+                self._release_ssh_client()
+
+            hostname = self.ip
+            pool_key = (
+                hostname,
+                self.username,
+                int(self.port),
                 self.key_pair.private_key_path,
             )
-        except SSHException:
-            pass
+            client = _ssh_pool.get(pool_key)
+            if client is not None:
+                self._ssh_client = client
+                self._ssh_pool_key = pool_key
+                return client, True
+
+            client = paramiko.SSHClient()
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
+            if not self._pkey_loaded:
+                self._pkey = self._load_private_key()
+                self._pkey_loaded = True
+
+            try:
+                client.connect(
+                    username=self.username,
+                    hostname=hostname,
+                    port=int(self.port),
+                    timeout=self.connect_timeout,
+                    banner_timeout=self.banner_timeout,
+                    auth_timeout=self.auth_timeout,
+                    pkey=self._pkey,
+                    key_filename=None if self._pkey else self.key_pair.private_key_path,
+                )
+            except (
+                ConnectionRefusedError,
+                AuthenticationException,
+                BadHostKeyException,
+                ConnectionResetError,
+                SSHException,
+                OSError,
+            ) as e:
+                error_msg = f"{type(e).__name__}: {str(e)}"
+                raise SSHException(error_msg) from e
+            transport = client.get_transport()
+            transport.set_keepalive(self.keepalive_interval)
+            # Commands and their output are mostly small packets: don't let
+            # Nagle's algorithm delay them waiting for more data
+            with suppress(OSError):
+                transport.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            _ssh_pool.put(pool_key, client)
+            self._ssh_client = client
+            self._ssh_pool_key = pool_key
+            return client, False
+
+    def _load_private_key(self):
+        """Parse the private key used to connect to the instance.
+
+        The key is handed to paramiko directly, so it doesn't need to be read
+        and parsed again on every (re)connection.
+
+        Returns:
+            paramiko.PKey, or None if the key could not be parsed, in which
+            case the filename is passed to paramiko when connecting.
+        """
+        key_path = self.key_pair.private_key_path
         try:
-            client.connect(
-                username=self.username,
-                hostname=self.ip,
-                port=int(self.port),
-                timeout=self.connect_timeout,
-                banner_timeout=self.banner_timeout,
-                key_filename=self.key_pair.private_key_path,
-            )
-        except (
-            ConnectionRefusedError,
-            AuthenticationException,
-            BadHostKeyException,
-            ConnectionResetError,
-            SSHException,
-            OSError,
-        ) as e:
-            error_msg = f"{type(e).__name__}: {str(e)}"
-            raise SSHException(error_msg) from e
-        self._ssh_client = client
-        return client
+            mtime_ns = os.stat(key_path).st_mtime_ns
+        except OSError:
+            return None
+        return _ssh.parse_private_key(key_path, mtime_ns)
 
     def _sftp_connect(self):
         """Connect to instance via SFTP."""
         if self._sftp_client and self._sftp_client.get_channel().get_transport().is_active():
             return self._sftp_client
 
-        logging.getLogger("paramiko").setLevel(logging.INFO)
-
         # _ssh_connect() implements the required retry logic.
         client = self._ssh_connect()
-        sftpclient = client.open_sftp()
+        sftpclient = paramiko.SFTPClient.from_transport(
+            client.get_transport(),
+            window_size=_SFTP_WINDOW_SIZE,
+            max_packet_size=_SFTP_MAX_PACKET_SIZE,
+        )
         self._sftp_client = sftpclient
         return sftpclient
 
@@ -478,7 +916,13 @@ class BaseInstance(ABC):
         self._tmp_count += 1
         return path
 
-    def _wait_for_execute(self, old_boot_id=None, timeout: int = 40):
+    def _wait_for_execute(
+        self,
+        old_boot_id=None,
+        timeout: int = 40,
+        stop: Optional[threading.Event] = None,
+        deadline: Optional[float] = None,
+    ):
         """
         Wait until we can execute a command in the instance.
 
@@ -486,6 +930,9 @@ class BaseInstance(ABC):
             old_boot_id: boot id before restart. If provided, we will wait
             until we find a new boot id
             timeout: time to wait for instance to be reachable in minutes
+            stop: optional event which, when set, stops waiting early
+            deadline: optional `time.monotonic()` timestamp after which to
+                stop waiting, instead of after timeout
 
         Raises:
             PycloudlibTimeoutError: if instance can't be reached after timeout
@@ -495,40 +942,70 @@ class BaseInstance(ABC):
         # Wait 40 minutes before failing. AWS EC2 metal instances can take
         # over 20 minutes to start or restart, so we shouldn't lower
         # this timeout
-        start = time.time()
-        end = start + timeout * 60
-        while time.time() < end:
+        # Measure the timeout with a monotonic clock: the wall clock of the
+        # machine running pycloudlib may jump while waiting
+        start = time.monotonic()
+        end = start + timeout * 60 if deadline is None else deadline
+        attempt = 0
+        # Wait between attempts on an event rather than sleeping, so that
+        # setting stop ends the wait immediately
+        if stop is None:
+            stop = threading.Event()
+        while (now := time.monotonic()) < end:
+            if stop.is_set():
+                return
             try:
                 boot_id = self.get_boot_id()
                 if not old_boot_id or boot_id != old_boot_id:
                     return
             except (SSHException, OSError) as e:
                 self._log.debug("Failed to obtain new boot id: %s", e)
-            time.sleep(1)
-
+            # Back off with jitter so that many clients waiting on instances
+            # behind the same endpoint don't retry in lockstep
+            if stop.wait(min(backoff_delay(attempt, base=1.0, cap=5.0), end - now)):
+                return
+            attempt += 1
+
+        if deadline is None:
+            waited = f"{timeout} minutes"
+        else:
+            waited = f"{time.monotonic() - start:.0f} seconds, at the deadline"
         raise PycloudlibTimeoutError(
-            f"Instance can't be reached after {timeout} minutes. Failed to obtain new boot id",
+            f"Instance can't be reached after {waited}. Failed to obtain new boot id",
         )
 
     def _wait_for_cloudinit(self):
         """Wait until cloud-init has finished."""
         self._log.info("_wait_for_cloudinit to complete")
-        if self.execute("command -v systemctl").ok:
-            # We may have issues with cloud-init status early boot, so also
-            # ensure our cloud-init.target is active as an extra layer of
-            # protection against connecting before the system is ready
-            for _ in range(300):
-                with suppress(SSHException):
-                    if self.execute(
-                        ["systemctl", "is-active", "cloud-init.target"],
-                        no_log=True,
-                    ).ok:
-                        break
-                time.sleep(1)
-        cmd = ["cloud-init", "status", "--wait", "--long"]
-        self.execute(cmd, description="waiting for start")
+        self.execute(_WAIT_FOR_CLOUDINIT, description="waiting for start")
 
     def _sync_filesystem(self):
         """Sync the filesystem before powering down."""
         with suppress(SSHException):
             self.execute("sync")
+
+
+def execute_on_instances(
+    instances: Sequence[BaseInstance], command, **kwargs
+) -> Dict[BaseInstance, Result]:
+    """Execute the same command on several instances concurrently.
+
+    Each instance uses its own SSH connection, and paramiko releases the
+    GIL while waiting on the network, so the commands run in parallel.
+
+    Args:
+        instances: instances to execute the command on
+        command: command to execute, as accepted by `BaseInstance.execute`
+        kwargs: passed through to `BaseInstance.execute`
+
+    Returns:
+        dict mapping each instance to its Result
+
+    Raises SSHException if there are any problem with the ssh connection of
+    any instance
+    """
+    if not instances:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(32, len(instances))) as executor:
+        results = executor.map(lambda instance: instance.execute(command, **kwargs), instances)
+        return dict(zip(instances, results))
@@ -2,6 +2,7 @@
 """Base Key Class."""
 
 import os
+from pathlib import Path
 from typing import Optional
 
 from pycloudlib.errors import UnsetSSHKeyError
@@ -10,6 +11,10 @@ from pycloudlib.errors import UnsetSSHKeyError
 class KeyPair:
     """Key Class."""
 
+    # Many key pairs may be created, e.g. by test suites, so avoid giving
+    # each one a __dict__
+    __slots__ = ("name", "_public_key_path", "private_key_path", "_public_key_content")
+
     def __init__(
         self,
         public_key_path: Optional[str],
@@ -31,14 +36,14 @@ class KeyPair:
         self.public_key_path = public_key_path
 
         # don't set private key path if public key path is None (ssh key is unset)
-        if self.public_key_path is None:
+        if public_key_path is None:
             self.private_key_path = None
             return
 
-        self.private_key_path = private_key_path or self.public_key_path.replace(".pub", "")
+        self.private_key_path = private_key_path or public_key_path.replace(".pub", "")
 
         # Expand user paths after setting private key path
-        self.public_key_path = os.path.expanduser(self.public_key_path)
+        self.public_key_path = os.path.expanduser(public_key_path)
         self.private_key_path = os.path.expanduser(self.private_key_path)
 
     def __str__(self):
@@ -47,13 +52,28 @@ class KeyPair:
             self.private_key_path, self.public_key_path, self.name
         )
 
+    @property
+    def public_key_path(self) -> Optional[str]:
+        """Path to the public key."""
+        return self._public_key_path
+
+    @public_key_path.setter
+    def public_key_path(self, path: Optional[str]):
+        self._public_key_path = path
+        # Read the key again from its new path
+        self._public_key_content: Optional[str] = None
+
     @property
     def public_key_content(self):
         """Read the contents of the public key.
 
+        The key is read once, on first access.
+
         Returns:
             str: The public key content
         """
-        if self.public_key_path is None:
-            raise UnsetSSHKeyError()
-        return open(self.public_key_path, encoding="utf-8").read()
+        if self._public_key_content is None:
+            if self.public_key_path is None:
+                raise UnsetSSHKeyError()
+            self._public_key_content = Path(self.public_key_path).read_text(encoding="utf-8")
+        return self._public_key_content
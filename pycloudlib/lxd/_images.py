@@ -1,13 +1,18 @@
 """LXD/LXD images' related functionalities."""
 
 import functools
-import itertools
 import json
 import logging
-from typing import Any, List, Optional, Sequence, Tuple
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional, Sequence, Tuple
+
+import yaml
 
 from pycloudlib.cloud import ImageType
-from pycloudlib.util import subp
+from pycloudlib.util import backoff_delay, subp
 
 _REMOTE_DAILY = "ubuntu-daily"
 _REMOTE_RELEASE = "ubuntu"
@@ -15,6 +20,22 @@ _REMOTE_DAILY_MINIMAL = "ubuntu-minimal-daily"
 _REMOTE_RELEASE_MINIMAL = "ubuntu-minimal"
 log = logging.getLogger(__name__)
 
+# Errors listing images which are worth retrying, e.g. "connection reset by
+# peer", "TLS handshake timeout" or HTTP status 503. Statuses are matched as
+# whole words, so that they don't match within image fingerprints or ids.
+_TRANSIENT_ERROR = re.compile(
+    r"connection (reset|refused)|timeout|timed out|EOF|temporar|\b50[234]\b", re.IGNORECASE
+)
+
+# Number of image lists kept, and seconds for which they are reused. Daily
+# images are published at most once a day.
+_IMAGE_CACHE_SIZE = 256
+_IMAGE_CACHE_MAX_AGE = 60 * 60
+_image_cache_lock = threading.Lock()
+# Image lists by remote and filters, and single images by ("show", image id),
+# with the monotonic time they were looked up
+_image_cache: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+
 
 def find_last_fingerprint(
     daily: bool,
@@ -41,38 +62,28 @@ def find_last_fingerprint(
     else:
         remote = _REMOTE_DAILY if daily else _REMOTE_RELEASE
     remote += ":"
-    base_filters = (
+    filters = (
         ("architecture", arch),
         ("release", release),
         ("label", label),
     )
-    filters = (
-        *base_filters,
-        ("type", "container" if is_container else "virtual-machine"),
-    )
-    find_images = functools.partial(_find_images, remote)
-    found_images: Any = find_images(filters)
-
-    # Note: This block is needed to support lxd <= 4
-    if not found_images:
-        if is_container:
-            filters = (*base_filters, ("type", "squashfs"))
-            found_images = iter(find_images(filters))
-        else:
-            filters_kvm = (*base_filters, ("type", "disk-kvm.img"))
-            filters_disk1 = (*base_filters, ("type", "disk1.img"))
-            filters_uefi1 = (*base_filters, ("type", "uefi1.img"))
-            found_images = itertools.chain.from_iterable(
-                map(
-                    find_images,
-                    (filters_kvm, filters_disk1, filters_uefi1),
-                )
-            )
-    try:
-        image = next(iter(found_images))
-    except StopIteration:
-        return None
-    return "%s%s" % (remote, image["fingerprint"])
+    image_types: Tuple[str, ...]
+    if is_container:
+        # Note: squashfs is needed to support lxd <= 4
+        image_types = ("container", "squashfs")
+    else:
+        # Note: the *.img types are needed to support lxd <= 4
+        image_types = ("virtual-machine", "disk-kvm.img", "disk1.img", "uefi1.img")
+
+    # lxc filters images on everything but their type, matching values as
+    # it does, e.g. as regular expressions. Types are filtered here, so that
+    # falling back to older image types doesn't list images again.
+    found_images = _find_images(remote, filters)
+    for lxd_type in image_types:
+        for image in found_images:
+            if _matches(image, (("type", lxd_type),)):
+                return "%s%s" % (remote, image["fingerprint"])
+    return None
 
 
 def find_release(image_id: str) -> Optional[str]:
@@ -87,10 +98,9 @@ def find_release(image_id: str) -> Optional[str]:
         not found.
     """
     release = None
-    images = _find_images(image_id)
-    if not images:
+    image_info = _show_image(image_id)
+    if not image_info:
         return release
-    image_info = images[0]
 
     properties = image_info.get("properties")
     if not properties:
@@ -116,16 +126,14 @@ def find_image_serial(image_id: str) -> Optional[str]:
         serial of latest image
     """
     if ":" not in image_id:
-        remote = _REMOTE_DAILY
-    else:
-        remote, image_id = image_id.split(":", 1)
-    filters = (("fingerprint", image_id),)
-    image = _find_images(remote, filters)
+        image_id = f"{_REMOTE_DAILY}:{image_id}"
+    image = _show_image(image_id)
     if not image:
         return None
-    return image[0]["properties"]["serial"]
+    return image["properties"]["serial"]
 
 
+@functools.lru_cache(maxsize=64)
 def _normalize_remote(remote: Optional[str] = None) -> str:
     if not remote:
         remote = _REMOTE_DAILY
@@ -134,9 +142,22 @@ def _normalize_remote(remote: Optional[str] = None) -> str:
     return remote
 
 
+def invalidate_image_cache():
+    """Forget the images found so far.
+
+    Called whenever images are created or deleted, so they are listed again.
+    """
+    with _image_cache_lock:
+        _image_cache.clear()
+
+
 def _find_images(remote: str, filters: Optional[Sequence[Tuple[str, str]]] = None) -> List[dict]:
     """Find the images filtered by filters criteria.
 
+    Images are only listed once for each remote and filters within
+    _IMAGE_CACHE_MAX_AGE, see invalidate_image_cache. The returned list must
+    not be modified.
+
     Args:
         remote: LXD's remote
         filters: Key-value filters to match on
@@ -144,7 +165,68 @@ def _find_images(remote: str, filters: Optional[Sequence[Tuple[str, str]]] = Non
     Returns:
         list of dictionaries with image's info
     """
-    remote = _normalize_remote(remote)
+    key = (_normalize_remote(remote), None if filters is None else tuple(filters))
+    return _cached(key, lambda: _list_images(*key))
+
+
+def _show_image(image_id: str) -> Optional[dict]:
+    """Get a single image, rather than listing images to filter them.
+
+    The same caching as for _find_images applies.
+
+    Args:
+        image_id: string, <remote>:<image identifier>
+
+    Returns:
+        dictionary with the image's info, or None if not found
+    """
+    return _cached(("show", image_id), lambda: _load_image(image_id))
+
+
+def _matches(image: dict, filters: Sequence[Tuple[str, str]]) -> bool:
+    """Return whether the image has all the exact values of filters.
+
+    Like lxc, filters are matched on the image's properties, as well as on
+    its own fields, e.g. its type. Unlike lxc, values are only matched
+    exactly, which is enough for the known values of image types.
+    """
+    properties = image.get("properties") or {}
+    return all(properties.get(key) == value or image.get(key) == value for key, value in filters)
+
+
+def _cached(key: Hashable, load: Callable[[], Any]) -> Any:
+    """Return the cached value for key, loading and caching it if needed."""
+    with _image_cache_lock:
+        entry = _image_cache.get(key)
+        if entry is not None and time.monotonic() - entry[1] < _IMAGE_CACHE_MAX_AGE:
+            _image_cache.move_to_end(key)
+            return entry[0]
+
+    value = load()
+    with _image_cache_lock:
+        _image_cache[key] = (value, time.monotonic())
+        _image_cache.move_to_end(key)
+        while len(_image_cache) > _IMAGE_CACHE_SIZE:
+            _image_cache.popitem(last=False)
+    return value
+
+
+def _lxc_with_retries(cmd: List[str]) -> str:
+    num = 5
+
+    # retry for resilience against connection reset by peer
+    for i in range(num - 1):
+        try:
+            return subp(cmd)
+        except RuntimeError as e:
+            if not _TRANSIENT_ERROR.search(str(e)):
+                raise e
+            log.warning("Failed to get image info, retrying due to: %s", e)
+            time.sleep(backoff_delay(i, base=0.2, cap=3.0))
+    return subp(cmd)
+
+
+def _list_images(remote: str, filters: Optional[Tuple[Tuple[str, str], ...]]) -> List[dict]:
     cmd = [
         "lxc",
         "image",
@@ -153,18 +235,14 @@ def _find_images(remote: str, filters: Optional[Sequence[Tuple[str, str]]] = Non
         "--format=json",
     ]
     if filters is not None:
-        compiled_filters = map(lambda f: f"{f[0]}={f[1]}", filters)
-        cmd.extend(compiled_filters)
-    num = 5
+        cmd.extend(f"{key}={value}" for key, value in filters)
+    return json.loads(_lxc_with_retries(cmd))
 
-    # retry for resilience against connection reset by peer
-    image_json = []
-    for i in range(num):
-        try:
-            image_json = json.loads(subp(cmd))
-            break
-        except RuntimeError as e:
-            if i == num - 1:
-                raise e
-            log.warning("Failed to get image list, retrying due to: %s", e)
-    return image_json
+
+def _load_image(image_id: str) -> Optional[dict]:
+    try:
+        return yaml.safe_load(_lxc_with_retries(["lxc", "image", "show", image_id]))
+    except RuntimeError as e:
+        if "not found" not in str(e).lower():
+            raise
+        return None
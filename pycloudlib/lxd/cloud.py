@@ -1,19 +1,44 @@
 # This file is part of pycloudlib. See LICENSE file for license information.
 """LXD Cloud type."""
 
+import asyncio
+import csv
+import functools
+import io
+import threading
 import warnings
 from abc import ABC
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from itertools import count
-from typing import List, Optional
-
-import yaml
+from typing import DefaultDict, List, Optional, Set
 
 from pycloudlib.cloud import BaseCloud, ImageType
 from pycloudlib.constants import LOCAL_UBUNTU_ARCH
 from pycloudlib.lxd import _images
 from pycloudlib.lxd.defaults import base_vm_profiles
 from pycloudlib.lxd.instance import LXDInstance, LXDVirtualMachineInstance
-from pycloudlib.util import subp
+from pycloudlib.util import subp, subp_many
+
+# Number of instances or images deleted at once by delete_instances and
+# delete_images
+_MAX_CONCURRENT_DELETES = 8
+# Default number of instances initialized, or waited for, at once by
+# launch_many
+_MAX_CONCURRENT_LAUNCHES = 8
+# Start of the line of lxc init output giving the name of unnamed instances
+_INSTANCE_NAME_PREFIX = "Instance name is: "
+
+
+def _collect_exceptions(futures) -> List[Exception]:
+    """Return the exceptions raised or returned by futures of deletions."""
+    exceptions: List[Exception] = []
+    for future in futures:
+        try:
+            exceptions.extend(future.result() or [])
+        except Exception as e:  # pylint: disable=broad-except
+            exceptions.append(e)
+    return exceptions
 
 
 class _BaseLXD(BaseCloud, ABC):
@@ -31,6 +56,9 @@ class _BaseLXD(BaseCloud, ABC):
         super().__init__(*args, **kwargs)
         self.created_profiles = []
         self.created_snapshots = []
+        # Names of existing profiles, listed when first needed
+        self._profile_cache: Optional[Set[str]] = None
+        self._profile_locks: DefaultDict[str, threading.Lock] = defaultdict(threading.Lock)
 
     def clone(self, base, new_instance_name):
         """Create copy of an existing instance or snapshot.
@@ -66,22 +94,40 @@ class _BaseLXD(BaseCloud, ABC):
             profile_config: Config to be added to the new profile
             force: Force the profile creation if it already exists
         """
-        profile_yaml = subp(["lxc", "profile", "list", "--format", "yaml"])
-        profile_list = [profile["name"] for profile in yaml.safe_load(profile_yaml)]
-
-        if profile_name in profile_list and not force:
-            msg = f"The profile named {profile_name} already exists"
-            self._log.debug(msg)
-            return
-
-        if force:
-            self._log.debug("Deleting current profile %s ...", profile_name)
-            subp(["lxc", "profile", "delete", profile_name])
-
-        self._log.debug("Creating profile %s ...", profile_name)
-        subp(["lxc", "profile", "create", profile_name])
-        subp(["lxc", "profile", "edit", profile_name], data=profile_config)
-        self.created_profiles.append(profile_name)
+        # Instances launched concurrently may need the same profile
+        with self._profile_locks[profile_name]:
+            # Profiles only need listing to know whether to create one
+            if not force and profile_name in self._get_profiles():
+                msg = f"The profile named {profile_name} already exists"
+                self._log.debug(msg)
+                return
+
+            if force:
+                self._log.debug("Deleting current profile %s ...", profile_name)
+                subp(["lxc", "profile", "delete", profile_name])
+
+            self._log.debug("Creating profile %s ...", profile_name)
+            subp(["lxc", "profile", "create", profile_name])
+            if self._profile_cache is not None:
+                self._profile_cache.add(profile_name)
+            subp(["lxc", "profile", "edit", profile_name], data=profile_config)
+            self.created_profiles.append(profile_name)
+
+    def _get_profiles(self) -> Set[str]:
+        """Return the names of existing profiles, listing them only once."""
+        if self._profile_cache is None:
+            output = subp(["lxc", "profile", "list", "--format=csv"])
+            # Descriptions may contain quoted newlines: parse whole records
+            self._profile_cache = {row[0] for row in csv.reader(io.StringIO(output)) if row}
+        return self._profile_cache
+
+    def invalidate_profile_cache(self):
+        """Forget the profiles listed so far, so they are listed again.
+
+        Needed when profiles are created or deleted other than by this
+        object.
+        """
+        self._profile_cache = None
 
     def delete_instance(self, instance_name, wait=True):
         """Delete an instance.
@@ -94,6 +140,23 @@ class _BaseLXD(BaseCloud, ABC):
         inst = self.get_instance(instance_name)
         inst.delete(wait)
 
+    def delete_instances(self, instance_names, wait=True) -> List[Exception]:
+        """Delete instances concurrently.
+
+        Args:
+            instance_names: names of the instances to delete
+            wait: wait for deletes to complete
+
+        Returns:
+            list of exceptions raised while deleting the instances
+        """
+        with ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_DELETES) as executor:
+            futures = [
+                executor.submit(self.get_instance(instance_name).delete, wait)
+                for instance_name in instance_names
+            ]
+        return _collect_exceptions(futures)
+
     def get_instance(self, instance_id, *, username: Optional[str] = None, **kwargs):
         """Get an existing instance.
 
@@ -108,9 +171,7 @@ class _BaseLXD(BaseCloud, ABC):
         return self._lxd_instance_cls(instance_id, key_pair=self.key_pair, username=username)
 
     def _normalize_image_id(self, image_id: str) -> str:
-        if ":" not in image_id:
-            return self._daily_remote + ":" + image_id
-        return image_id
+        return image_id if ":" in image_id else f"{self._daily_remote}:{image_id}"
 
     # pylint: disable=R0914,R0912,R0915
     def _prepare_command(
@@ -153,31 +214,25 @@ class _BaseLXD(BaseCloud, ABC):
             cmd.append(name)
 
         if self.key_pair:
-            metadata = "public-keys: {}".format(self.key_pair.public_key_content)
+            metadata = f"public-keys: {self.key_pair.public_key_content}"
             config_dict["user.meta-data"] = metadata
 
         if ephemeral:
             cmd.append("--ephemeral")
 
         if network:
-            cmd.append("--network")
-            cmd.append(network)
+            cmd.extend(("--network", network))
 
         if storage:
-            cmd.append("--storage")
-            cmd.append(storage)
+            cmd.extend(("--storage", storage))
 
         if inst_type:
-            cmd.append("--type")
-            cmd.append(inst_type)
-
-        for profile in profile_list:
-            cmd.append("--profile")
-            cmd.append(profile)
+            cmd.extend(("--type", inst_type))
 
-        for key, value in config_dict.items():
-            cmd.append("--config")
-            cmd.append("%s=%s" % (key, value))
+        cmd.extend(arg for profile in profile_list for arg in ("--profile", profile))
+        cmd.extend(
+            arg for key, value in config_dict.items() for arg in ("--config", f"{key}={value}")
+        )
 
         if user_data:
             if "user.user-data" in config_dict:
@@ -185,8 +240,7 @@ class _BaseLXD(BaseCloud, ABC):
                     "User data cannot be defined in config_dict and also"
                     "passed through user_data. Pick one"
                 )
-            cmd.append("--config")
-            cmd.append("user.user-data=%s" % user_data)
+            cmd.extend(("--config", f"user.user-data={user_data}"))
 
         return cmd
 
@@ -203,10 +257,12 @@ class _BaseLXD(BaseCloud, ABC):
         config_dict=None,
         execute_via_ssh=True,
         username: Optional[str] = None,
+        start=False,
     ):
         """Init a container.
 
-        This will initialize a container, but not launch or start it.
+        This will initialize a container, but not launch or start it unless
+        start is True.
         If no remote is specified pycloudlib default to daily images.
 
         Args:
@@ -222,6 +278,7 @@ class _BaseLXD(BaseCloud, ABC):
             config_dict: dict, optional, configuration values to pass
             execute_via_ssh: bool, optional, execute commands on the instance
                              via SSH if True (the default)
+            start: boolean, optional, start the instance without waiting
 
         Returns:
             The created LXD instance object
@@ -241,12 +298,15 @@ class _BaseLXD(BaseCloud, ABC):
             user_data=user_data,
             config_dict=config_dict,
         )
-
-        self._log.info(cmd)
+        self._log.debug("Running %s", cmd)
         result = subp(cmd)
 
         if not name:
-            name = result.split("Instance name is: ")[1]
+            name = next(
+                line[len(_INSTANCE_NAME_PREFIX) :]
+                for line in result.splitlines()
+                if line.startswith(_INSTANCE_NAME_PREFIX)
+            )
 
         self._log.debug("Created %s", name)
         instance = self._lxd_instance_cls(
@@ -257,7 +317,11 @@ class _BaseLXD(BaseCloud, ABC):
             ephemeral=ephemeral,
             username=username,
         )
+        # Instances are tracked before being started, so that clean deletes
+        # them even if they fail to start
         self.created_instances.append(instance)
+        if start:
+            instance.start(wait=False)
         return instance
 
     def launch(
@@ -301,7 +365,7 @@ class _BaseLXD(BaseCloud, ABC):
         """
         if not image_id:
             raise ValueError(f"{self._type} launch requires image_id param. Found: {image_id}")
-        instance = self.init(
+        return self.init(
             name=name or f"{self.tag}-{next(self._instance_counter)}",
             image_id=image_id,
             ephemeral=ephemeral,
@@ -313,10 +377,84 @@ class _BaseLXD(BaseCloud, ABC):
             config_dict=config_dict,
             execute_via_ssh=execute_via_ssh,
             username=username,
+            start=True,
         )
-        instance.start(wait=False)
 
-        return instance
+    async def alaunch(self, image_id, *args, **kwargs):
+        """Set up and launch a container without blocking the event loop.
+
+        The lxc calls run in a worker thread, so several launches can be
+        awaited concurrently, e.g. with asyncio.gather.
+
+        Args:
+            image_id: string, [<remote>:]<image>, the image to launch
+            args: passed through to `launch`
+            kwargs: passed through to `launch`
+
+        Returns:
+            The created LXD instance object
+        """
+        return await self._run_in_executor(self.launch, image_id, *args, **kwargs)
+
+    async def aclone(self, base, new_instance_name):
+        """Create copy of an existing instance or snapshot, as `clone` does.
+
+        Args:
+            base: base instance or instance/snapshot
+            new_instance_name: name of new instance
+
+        Returns:
+            The created LXD instance object
+        """
+        return await self._run_in_executor(self.clone, base, new_instance_name)
+
+    async def adelete_instance(self, instance_name, wait=True):
+        """Delete an instance without blocking the event loop.
+
+        Args:
+            instance_name: instance name to delete
+            wait: wait for delete to complete
+        """
+        return await self._run_in_executor(self.delete_instance, instance_name, wait)
+
+    @staticmethod
+    async def _run_in_executor(func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    def launch_many(
+        self, specs: List[dict], wait=True, max_workers=_MAX_CONCURRENT_LAUNCHES
+    ) -> list:
+        """Set up and launch several instances at once.
+
+        Instances are initialized concurrently, then started with a single
+        lxc call, so the LXD daemon can start them in parallel. Images and
+        profiles shared by instances are looked up and created only once.
+
+        Some storage backends are unreliable when creating many instances
+        at once, in which case max_workers can be lowered.
+
+        Args:
+            specs: list of dicts of keyword arguments, as taken by init.
+                   Instances are named as by launch if no name is given.
+            wait: boolean, wait for all instances to fully start
+            max_workers: number of instances initialized, or waited for,
+                         at once
+
+        Returns:
+            The created LXD instance objects, in the order of specs
+        """
+        specs = [{"name": f"{self.tag}-{next(self._instance_counter)}", **spec} for spec in specs]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            instances = list(executor.map(lambda spec: self.init(**spec), specs))
+        if not instances:
+            return instances
+
+        subp(["lxc", "start", *(instance.name for instance in instances)])
+        if wait:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(lambda instance: instance.wait(), instances))
+        return instances
 
     def released_image(
         self,
@@ -386,6 +524,14 @@ class _BaseLXD(BaseCloud, ABC):
         self._log.debug("finding image serial for LXD Ubuntu image %s", image_id)
         return _images.find_image_serial(image_id)
 
+    def invalidate_image_cache(self):
+        """Forget the images found so far, so they are looked up again.
+
+        Image lookups, e.g. by released_image and daily_image, are reused
+        for up to an hour.
+        """
+        _images.invalidate_image_cache()
+
     def delete_image(self, image_id, **kwargs):
         """Delete the image.
 
@@ -395,8 +541,22 @@ class _BaseLXD(BaseCloud, ABC):
         self._log.debug("Deleting image: '%s'", image_id)
 
         subp(["lxc", "image", "delete", image_id])
+        _images.invalidate_image_cache()
         self._log.debug("Deleted %s", image_id)
 
+    def delete_images(self, image_ids) -> List[Exception]:
+        """Delete images concurrently.
+
+        Args:
+            image_ids: list of LXD image fingerprints
+
+        Returns:
+            list of exceptions raised while deleting the images
+        """
+        with ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_DELETES) as executor:
+            futures = [executor.submit(self.delete_image, image_id) for image_id in image_ids]
+        return _collect_exceptions(futures)
+
     def snapshot(self, instance, clean=True, name=None):
         """Take a snapshot of the passed in instance for use as image.
 
@@ -424,19 +584,20 @@ class _BaseLXD(BaseCloud, ABC):
         """
         exceptions = super().clean()
 
-        for snapshot in self.created_snapshots:
-            try:
-                subp(["lxc", "image", "delete", snapshot])
-            except RuntimeError as e:
-                if "Image not found" not in str(e):
-                    exceptions.append(e)
-
-        for profile in self.created_profiles:
-            try:
-                subp(["lxc", "profile", "delete", profile])
-            except RuntimeError as e:
-                if "Profile not found" not in str(e):
-                    exceptions.append(e)
+        # Deletions are independent, so run them all at once
+        for result in subp_many(
+            [["lxc", "image", "delete", snapshot] for snapshot in self.created_snapshots]
+        ):
+            if isinstance(result, RuntimeError) and "Image not found" not in str(result):
+                exceptions.append(result)
+        _images.invalidate_image_cache()
+
+        for result in subp_many(
+            [["lxc", "profile", "delete", profile] for profile in self.created_profiles]
+        ):
+            if isinstance(result, RuntimeError) and "Profile not found" not in str(result):
+                exceptions.append(result)
+        self.invalidate_profile_cache()
         return exceptions
 
 
@@ -8,6 +8,7 @@ from typing import List, Optional
 
 from pycloudlib.errors import PycloudlibTimeoutError
 from pycloudlib.instance import BaseInstance
+from pycloudlib.lxd import _images
 from pycloudlib.util import subp
 
 MISSING_AGENT_MSG = (
@@ -15,6 +16,12 @@ MISSING_AGENT_MSG = (
     " you may see unavoidable failures.\n"
     "See https://github.com/canonical/pycloudlib/issues/132 for details."
 )
+# Instance type in lxc info, e.g. "container (ephemeral)" or "virtual-machine"
+_INFO_TYPE = re.compile(r"Type: (.*)")
+# Instance status in lxc info
+_INFO_STATUS = re.compile(r"Status: (.*)")
+# Errors of lxc query for which the state is looked up with lxc info
+_QUERY_FALLBACK_ERROR = re.compile(r"unknown command|not found", re.IGNORECASE)
 
 
 # pylint: disable=too-many-public-methods
@@ -22,6 +29,9 @@ class LXDInstance(BaseInstance):
     """LXD backed instance."""
 
     _type = "lxd"
+    # Looking up the address of a container is a local query, and containers
+    # aren't rebooted while starting
+    _overlap_start_and_execute = True
     _is_vm = None
     _is_ephemeral = None
 
@@ -64,17 +74,18 @@ class LXDInstance(BaseInstance):
         if self.execute_via_ssh:
             return super()._run_command(command, stdin, get_pty=get_pty)
 
-        base_cmd = [
-            "lxc",
-            "exec",
-            self.name,
-            "--",
-            "sudo",
-            "-u",
-            self.username,
-            "--",
-        ]
-        return subp(base_cmd + list(command), rcs=None)
+        # Build the whole command at once, rather than copying command into
+        # a new list to concatenate to a prefix
+        return subp(
+            ["lxc", "exec", self.name, "--", "sudo", "-u", self.username, "--", *command],
+            rcs=None,
+        )
+
+    def _run_commands(self, commands):
+        """Run independent commands in the instance."""
+        if self.execute_via_ssh:
+            return super()._run_commands(commands)
+        return [self._run_command(command, None) for command in commands]
 
     def parse_ip(self, query: dict):
         """Return ip address from lxd query.
@@ -118,12 +129,11 @@ class LXDInstance(BaseInstance):
         if self._is_vm is None:
             result = subp(["lxc", "info", self.name])
 
-            try:
-                info_type = re.findall(r"Type: (.*)", result)[0]
-            except IndexError:
+            match = _INFO_TYPE.search(result)
+            if match is None:
                 return False
 
-            self._is_vm = bool(info_type == "virtual-machine")
+            self._is_vm = bool(match.group(1) == "virtual-machine")
 
         return self._is_vm
 
@@ -192,10 +202,10 @@ class LXDInstance(BaseInstance):
         if self._is_ephemeral is None:
             result = subp(["lxc", "info", self.name])
 
-            try:
-                info_type = re.findall(r"Type: (.*)", result)[0]
-                self._is_ephemeral = bool("ephemeral" in info_type)
-            except IndexError:
+            match = _INFO_TYPE.search(result)
+            if match is not None:
+                self._is_ephemeral = bool("ephemeral" in match.group(1))
+            else:
                 self._log.debug(
                     "Unable to parse lxc show %s to determine ephemeral type."
                     " Assuming not ephemeral.",
@@ -211,13 +221,26 @@ class LXDInstance(BaseInstance):
         If unable to get status will return 'Unknown'.
 
         Returns:
-            Reported status from lxc info
+            Reported status, as shown by lxc info
 
         """
-        result = subp(["lxc", "info", self.name])
+        # Unlike lxc info, querying the instance alone doesn't gather its
+        # runtime state, which for VMs means asking the LXD agent
+        remote, _, name = self.name.rpartition(":")
+        path = f"/1.0/instances/{name}"
+        try:
+            result = subp(["lxc", "query", f"{remote}:{path}" if remote else path])
+        except RuntimeError as e:
+            # Older lxc lack the query command, and lxc query only looks up
+            # instances of the default project, unlike lxc info which uses
+            # the current one. lxc info reports missing instances itself.
+            if not _QUERY_FALLBACK_ERROR.search(str(e)):
+                raise
+            match = _INFO_STATUS.search(subp(["lxc", "info", self.name]))
+            return match.group(1).upper() if match else "Unknown"
         try:
-            return re.findall(r"Status: (.*)", result)[0]
-        except IndexError:
+            return json.loads(result)["status"].upper()
+        except (ValueError, KeyError):
             return "Unknown"
 
     def console_log(self):
@@ -251,6 +274,7 @@ class LXDInstance(BaseInstance):
         Args:
             wait: wait for delete
         """
+        self._drop_ssh_connection()
         self._log.debug("deleting %s", self.name)
 
         try:
@@ -377,6 +401,7 @@ class LXDInstance(BaseInstance):
         """
         self._log.debug("restoring %s from snapshot %s", self.name, snapshot_name)
         subp(["lxc", "restore", self.name, snapshot_name])
+        self._apt_updated_at = None
 
     def shutdown(self, wait=True, force=False, **kwargs):
         """Shutdown instance.
@@ -385,16 +410,20 @@ class LXDInstance(BaseInstance):
             wait: boolean, wait for instance to shutdown
             force: boolean, force instance to shutdown
         """
-        if self.state == "Stopped":
-            return
-
         self._log.debug("shutting down %s", self.name)
         cmd = ["lxc", "stop", self.name]
 
         if force:
             cmd.append("--force")
 
-        subp(cmd)
+        # Stop unconditionally rather than checking the state first, which
+        # would cost another lxc call
+        try:
+            subp(cmd)
+        except RuntimeError as e:
+            if "already stopped" not in str(e):
+                raise
+            return
 
         if wait:
             self.wait_for_stop()
@@ -445,6 +474,7 @@ class LXDInstance(BaseInstance):
 
         self._log.debug("Publishing snapshot %s", snapshot_name)
         subp(cmd)
+        _images.invalidate_image_cache()
         return "local:{}".format(snapshot_name)
 
     def start(self, wait=True):
@@ -453,11 +483,15 @@ class LXDInstance(BaseInstance):
         Args:
             wait: boolean, wait for instance to fully start
         """
-        if self.state == "Running":
-            return
-
         self._log.debug("starting %s", self.name)
-        subp(["lxc", "start", self.name])
+        # Start unconditionally rather than checking the state first, which
+        # would cost another lxc call
+        try:
+            subp(["lxc", "start", self.name])
+        except RuntimeError as e:
+            if "already running" not in str(e):
+                raise
+            return
 
         if wait:
             self.wait()
@@ -530,6 +564,9 @@ class LXDInstance(BaseInstance):
 class LXDVirtualMachineInstance(LXDInstance):
     """LXD Virtual Machine backed instance."""
 
+    # VMs may be reachable before the reboot done while initializing them
+    _overlap_start_and_execute = False
+
     def _run_command(self, command, stdin):
         """Run command in the instance."""
         if self.execute_via_ssh:
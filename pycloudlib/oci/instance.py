@@ -123,6 +123,7 @@ class OciInstance(BaseInstance):
         Args:
             wait: wait for instance to be deleted
         """
+        self._drop_ssh_connection()
         try:
             self.compute_client.terminate_instance(self.instance_data.id)
             if wait:
@@ -117,6 +117,7 @@ class OpenstackInstance(BaseInstance):
         Args:
             wait: wait for instance to be deleted
         """
+        self._drop_ssh_connection()
         exceptions = []
         try:
             self.conn.compute.delete_server(self.server.id)
@@ -5,9 +5,10 @@ import os
 import re
 import shutil
 import subprocess
+import time
 from itertools import count
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import paramiko
 import requests
@@ -23,6 +24,36 @@ from pycloudlib.qemu.instance import QemuInstance
 from pycloudlib.qemu.util import get_free_port
 from pycloudlib.util import UBUNTU_RELEASE_VERSION_MAP, add_key_to_cloud_config
 
+# Seconds for which the date of the latest image on a release page is reused
+_LATEST_DATE_MAX_AGE = 60 * 60
+# Date of the latest image by release page URL, with the monotonic time it
+# was fetched at. Shared between clouds, so that creating many of them
+# doesn't fetch the same pages again.
+_latest_dates: Dict[str, Tuple[str, float]] = {}
+
+
+def _get_latest_date(base_url: str) -> str:
+    """Get the date of the latest image on a release page.
+
+    Args:
+        base_url: URL of the release page
+
+    Returns:
+        A string containing the date of the latest image
+    """
+    cached = _latest_dates.get(base_url)
+    if cached is not None and time.monotonic() - cached[1] < _LATEST_DATE_MAX_AGE:
+        return cached[0]
+
+    resp = requests.get(base_url, timeout=5)
+    resp.raise_for_status()
+    match = re.search(r"<title>Ubuntu.*\[(?P<date>[^]]+).*</title>", resp.text)
+    if not match:
+        raise PycloudlibError(f"Could not parse url: {base_url}")
+    date = match["date"]
+    _latest_dates[base_url] = (date, time.monotonic())
+    return date
+
 
 class Qemu(BaseCloud):
     """QEMU Cloud Class."""
@@ -149,12 +180,7 @@ class Qemu(BaseCloud):
             A string containing the path to the latest released image ID
             for the specified release.
         """
-        resp = requests.get(base_url, timeout=5)
-        resp.raise_for_status()
-        match = re.search(r"<title>Ubuntu.*\[(?P<date>[^]]+).*</title>", resp.text)
-        if not match:
-            raise PycloudlibError(f"Could not parse url: {base_url}")
-        date = match["date"]
+        date = _get_latest_date(base_url)
 
         img_url = f"{base_url}/{img_name}"
 
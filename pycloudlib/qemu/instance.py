@@ -134,6 +134,7 @@ class QemuInstance(BaseInstance):
         Args:
             wait: Ignored. Our 'quit' command is synchronous.
         """
+        self._drop_ssh_connection()
         if not self.instance_dir.exists():
             # We've already cleaned up. Nothing left to do
             return []
@@ -7,12 +7,14 @@ import datetime
 import logging
 import os
 import platform
+import random
+import selectors
 import shlex
 import subprocess
 import tempfile
 import traceback
 from errno import ENOENT
-from typing import Dict, List, Optional
+from typing import IO, Dict, List, Optional, Tuple, Union, cast
 from urllib.parse import parse_qs, urlparse
 
 import yaml
@@ -189,23 +191,84 @@ def subp(args, data=None, env=None, shell=False, rcs=(0,), shortcircuit_stdin=Tr
     else:
         stdin = None
 
-    bytes_args = _convert_args(args)
-
     try:
-        process = subprocess.Popen(  # pylint: disable=R1732
-            bytes_args,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            stdin=stdin,
-            env=env,
-            shell=shell,
-        )
+        process = _spawn(args, stdin=stdin, env=env, shell=shell)
         (out, err) = process.communicate(data)
     finally:
         if devnull_fp:
             devnull_fp.close()
 
-    rc = process.returncode
+    return _make_result(process.returncode, out, err, rcs)
+
+
+def subp_many(commands, env=None, rcs=(0,)) -> List[Union[Result, RuntimeError]]:
+    """Run several commands concurrently.
+
+    The output of every command is read in the calling thread, rather than
+    needing a thread per command as with subp.
+
+    Args:
+        commands: list of commands to run
+        env: optional env to use
+        rcs: tuple of successful exit codes, default: (0)
+
+    Returns:
+        For each command, its Result, or the RuntimeError subp would have
+        raised if it failed, so that every command is run to completion.
+
+    """
+    processes: List[subprocess.Popen] = []
+    outputs: List[Tuple[bytearray, bytearray]] = []
+    with open(os.devnull, "rb") as devnull_fp, selectors.DefaultSelector() as selector:
+        try:
+            for args in commands:
+                process = _spawn(args, stdin=devnull_fp, env=env)
+                processes.append(process)
+                outputs.append((bytearray(), bytearray()))
+                # _spawn always pipes both stdout and stderr
+                assert process.stdout is not None and process.stderr is not None
+                selector.register(process.stdout, selectors.EVENT_READ, outputs[-1][0])
+                selector.register(process.stderr, selectors.EVENT_READ, outputs[-1][1])
+            _read_pipes(selector)
+        except BaseException:
+            for process in processes:
+                process.kill()
+                process.wait()
+            raise
+
+    results: List[Union[Result, RuntimeError]] = []
+    for process, (out, err) in zip(processes, outputs):
+        try:
+            results.append(_make_result(process.wait(), out, err, rcs))
+        except RuntimeError as e:
+            results.append(e)
+    return results
+
+
+def _read_pipes(selector: selectors.BaseSelector):
+    """Read the pipes registered with selector into their data until EOF."""
+    while selector.get_map():
+        for key, _ in selector.select():
+            chunk = os.read(key.fd, 65536)
+            if chunk:
+                key.data.extend(chunk)
+            else:
+                selector.unregister(key.fileobj)
+                cast(IO[bytes], key.fileobj).close()
+
+
+def _spawn(args, stdin, env=None, shell=False) -> subprocess.Popen:
+    return subprocess.Popen(  # pylint: disable=R1732
+        _convert_args(args),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        stdin=stdin,
+        env=env,
+        shell=shell,
+    )
+
+
+def _make_result(rc, out, err, rcs) -> Result:
     out = "" if not out else out.rstrip().decode("utf-8")
     err = "" if not err else err.rstrip().decode("utf-8")
 
@@ -308,6 +371,26 @@ def _safe_int(possible_int):
         return None
 
 
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Return the delay before retrying, using exponential backoff with jitter.
+
+    The delay is drawn uniformly between 0 and `base * 2**attempt`, capped
+    at `cap` ("full jitter"). The randomness keeps clients that started
+    retrying at the same time from retrying in lockstep.
+
+    Args:
+        attempt: number of the failed attempt, starting from 0
+        base: upper bound of the delay after the first attempt
+        cap: maximum delay
+
+    Returns:
+        delay in seconds
+    """
+    # Clamp the exponent: 2**attempt overflows floats after 1023 attempts,
+    # and exceeds any sensible cap long before that
+    return random.uniform(0, min(cap, base * 2 ** min(attempt, 32)))
+
+
 def get_timestamped_tag(tag):
     """Create tag with current timestamp.
 
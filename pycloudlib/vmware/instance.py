@@ -55,6 +55,7 @@ class VMWareInstance(BaseInstance):
 
     def delete(self, wait=True) -> List[Exception]:
         """Delete the instance."""
+        self._drop_ssh_connection()
         exceptions: List[Exception] = []
         try:
             self.shutdown()
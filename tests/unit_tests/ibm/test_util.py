@@ -185,3 +185,38 @@ class TestWaitUntil:
             raise_on_fail=False,
         )
         assert [mock.call(1)] * 20 == m_sleep.call_args_list
+
+    @mock.patch(M_PATH + "monotonic")
+    @mock.patch(M_PATH + "sleep")
+    def test_deadline(self, m_sleep, m_monotonic):
+        """`deadline` supersedes `timeout_seconds`."""
+        check_fn = MagicMock()
+        check_fn.return_value = False
+        m_monotonic.side_effect = [10, 20, 30, 40]
+
+        with pytest.raises(PycloudlibTimeoutError, match="<msg>"):
+            wait_until(
+                check_fn=check_fn,
+                timeout_seconds=1,
+                timeout_msg_fn=lambda: "<msg>",
+                deadline=40,
+            )
+        assert 3 == check_fn.call_count
+        assert [mock.call(1)] * 3 == m_sleep.call_args_list
+
+    @mock.patch(M_PATH + "monotonic")
+    @mock.patch(M_PATH + "sleep")
+    def test_backoff(self, m_sleep, m_monotonic):
+        """The interval doubles up to `max_check_interval`."""
+        check_fn = MagicMock()
+        check_fn.side_effect = (False,) * 5 + (True,)
+        m_monotonic.return_value = 0
+
+        assert True is wait_until(
+            check_fn=check_fn,
+            timeout_seconds=600,
+            timeout_msg_fn=lambda: "<msg>",
+            check_interval=1,
+            max_check_interval=5,
+        )
+        assert [mock.call(i) for i in (1, 2, 4, 5, 5)] == m_sleep.call_args_list
@@ -1,3 +1,4 @@
+from concurrent.futures import Future
 from typing import List
 import mock
 import pytest
@@ -5,6 +6,7 @@ import pytest
 from pycloudlib.errors import InvalidTagNameError
 from pycloudlib.ibm_classic.cloud import IBMClassic
 from pycloudlib.ibm_classic.errors import IBMClassicException
+from pycloudlib.ibm_classic.instance import IBMClassicInstance
 
 
 class FakeClassic(IBMClassic):
@@ -127,3 +129,35 @@ def test_validate_tag(tag: str, rules_failed: List[str]):
         assert tag in str(exc_info.value)
         for rule in rules_failed:
             assert rule in str(exc_info.value)
+
+
+def _deleting_instance(result):
+    """Instance mock whose deletion returns, or raises, result."""
+    instance = mock.Mock(spec=IBMClassicInstance)
+    future: Future = Future()
+    if isinstance(result, Exception):
+        future.set_exception(result)
+    else:
+        future.set_result(result)
+    instance.delete_async.return_value = future
+    return instance
+
+
+def test_clean_deletes_instances_concurrently(mock_ibmclassic):
+    deleted = _deleting_instance([])
+    failed = _deleting_instance([IBMClassicException("returned")])
+    raising = _deleting_instance(IBMClassicException("raised"))
+    other = mock.Mock()
+    other.delete.side_effect = IBMClassicException("other")
+    mock_ibmclassic.created_instances = [deleted, failed, raising, other]
+    mock_ibmclassic.created_images = []
+    mock_ibmclassic.created_keys = [1]
+    mock_ibmclassic.created_security_groups = []
+
+    exceptions = mock_ibmclassic.clean()
+
+    assert ["other", "raised", "returned"] == sorted(str(e) for e in exceptions)
+    for instance in (deleted, failed, raising):
+        instance.delete_async.assert_called_once_with()
+    other.delete.assert_called_once_with()
+    mock_ibmclassic._ssh_key_manager.delete_key.assert_called_once_with(1)
@@ -0,0 +1,158 @@
+"""Module for IBM Classic instance tests."""
+
+from unittest import mock
+
+import pytest
+import SoftLayer  # type: ignore
+
+from pycloudlib.ibm_classic.errors import IBMClassicException
+from pycloudlib.ibm_classic.instance import IBMClassicInstance
+
+M_PATH = "pycloudlib.ibm_classic.instance."
+
+
+@pytest.fixture
+def vs_manager():
+    """Return a mocked SoftLayer VSManager."""
+    yield mock.MagicMock()
+
+
+def _instance(vs_manager, raw_instance):
+    return IBMClassicInstance(
+        key_pair=None,
+        softlayer_client=mock.MagicMock(),
+        vs_manager=vs_manager,
+        instance=raw_instance,
+    )
+
+
+class TestIP:
+    """Tests covering IBMClassicInstance.ip."""
+
+    def test_ip_from_raw_instance(self, vs_manager):
+        """IP already present on the raw instance doesn't trigger a fetch."""
+        inst = _instance(vs_manager, {"id": 1, "primaryIpAddress": "10.0.0.1"})
+        assert "10.0.0.1" == inst.ip
+        assert 0 == vs_manager.get_instance.call_count
+
+    def test_ip_resolved_once(self, vs_manager):
+        """A missing IP is fetched once and then cached."""
+        vs_manager.get_instance.return_value = {"id": 1, "primaryIpAddress": "10.0.0.2"}
+        inst = _instance(vs_manager, {"id": 1})
+        assert "10.0.0.2" == inst.ip
+        assert "10.0.0.2" == inst.ip
+        assert 1 == vs_manager.get_instance.call_count
+
+    def test_ip_unavailable(self, vs_manager):
+        """Raise when the IP address can't be determined."""
+        vs_manager.get_instance.return_value = {"id": 1}
+        inst = _instance(vs_manager, {"id": 1})
+        with pytest.raises(IBMClassicException):
+            inst.ip  # pylint: disable=pointless-statement
+
+    @mock.patch(M_PATH + "_wait_until")
+    def test_wait_for_instance_start_resolves_ip(self, _m_wait_until, vs_manager):
+        """The IP is resolved as part of waiting for the instance to start."""
+        vs_manager.get_instance.return_value = {
+            "id": 1,
+            "hostname": "host",
+            "primaryIpAddress": "10.0.0.3",
+        }
+        inst = _instance(vs_manager, {"id": 1, "hostname": "host"})
+        inst._wait_for_instance_start()  # pylint: disable=protected-access
+        assert "10.0.0.3" == inst.ip
+        assert 1 == vs_manager.get_instance.call_count
+
+
+class TestDeleteAsync:
+    """Tests covering IBMClassicInstance.delete_async."""
+
+    def test_delete_async(self, vs_manager):
+        """The deletion runs in the background and returns its exceptions."""
+        inst = _instance(vs_manager, {"id": 1, "hostname": "host"})
+        error = IBMClassicException("boom")
+        with mock.patch.object(inst, "delete", return_value=[error]) as m_delete:
+            future = inst.delete_async(wait=False)
+            assert [error] == future.result(timeout=5)
+        m_delete.assert_called_once_with(wait=False)
+
+
+class TestPowerState:
+    """Tests covering the power state checks used while polling."""
+
+    @pytest.mark.parametrize(
+        "raw_instance, expected",
+        [
+            (
+                {
+                    "powerState": {"keyName": "RUNNING"},
+                    "lastTransaction": {"transactionStatus": {"name": "COMPLETE"}},
+                },
+                True,
+            ),
+            (
+                {
+                    "powerState": {"keyName": "RUNNING"},
+                    "lastTransaction": {"transactionStatus": {"name": "COMPLETE"}},
+                    "activeTransaction": {},
+                },
+                False,
+            ),
+            ({"powerState": {"keyName": "HALTED"}}, False),
+            ({}, False),
+        ],
+    )
+    def test_has_settled_in_power_state(self, vs_manager, raw_instance, expected):
+        """Only a settled instance in the requested power state matches."""
+        vs_manager.get_instance.return_value = raw_instance
+        inst = _instance(vs_manager, {"id": 1, "hostname": "host"})
+        # pylint: disable=protected-access
+        assert expected is inst._has_settled_in_power_state("RUNNING")
+
+
+class TestWaitForDelete:
+    """Tests covering IBMClassicInstance.wait_for_delete."""
+
+    @mock.patch(M_PATH + "_wait_until")
+    def test_is_deleted(self, m_wait_until, vs_manager):
+        """The instance is deleted once SoftLayer reports it as not found."""
+        inst = _instance(vs_manager, {"id": 1, "hostname": "host"})
+        inst.wait_for_delete()
+        is_deleted = m_wait_until.call_args.args[0]
+
+        softlayer_client = inst._softlayer_client  # pylint: disable=protected-access
+        assert is_deleted() is False
+        softlayer_client.call.assert_called_once_with(
+            "Virtual_Guest", "getObject", id=1, mask="mask[id]"
+        )
+
+        softlayer_client.call.side_effect = SoftLayer.SoftLayerAPIError(
+            "SoftLayer_Exception_ObjectNotFound", "Unable to find object"
+        )
+        assert is_deleted() is True
+
+        softlayer_client.call.side_effect = SoftLayer.SoftLayerAPIError(
+            "SoftLayer_Exception_Public", "Internal error"
+        )
+        with pytest.raises(SoftLayer.SoftLayerAPIError):
+            is_deleted()
+        assert 0 == vs_manager.list_instances.call_count
+
+
+class TestDelete:
+    """Tests covering IBMClassicInstance.delete."""
+
+    @mock.patch(M_PATH + "time.monotonic", return_value=100)
+    @mock.patch(M_PATH + "_wait_until")
+    def test_single_deadline(self, m_wait_until, _m_monotonic, vs_manager):
+        """All the waits share the deadline derived from `timeout`."""
+        vs_manager.get_instance.return_value = {
+            "activeTransaction": {"transactionStatus": {"friendlyName": "busy"}}
+        }
+        inst = _instance(vs_manager, {"id": 1, "hostname": "host"})
+        with mock.patch.object(inst, "_wait_for_execute") as m_wait_for_execute:
+            assert [] == inst.delete(timeout=600)
+
+        assert [700, 700] == [c.kwargs["deadline"] for c in m_wait_until.call_args_list]
+        m_wait_for_execute.assert_called_once_with(deadline=700)
+        vs_manager.cancel_instance.assert_called_once_with(1)
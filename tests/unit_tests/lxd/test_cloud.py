@@ -1,5 +1,6 @@
 """Tests related to pycloudlib.lxd.cloud module."""
 
+import asyncio
 import contextlib
 import io
 from unittest import mock
@@ -52,11 +53,10 @@ class TestLaunch:
             "config_dict": {"user.custom": "val"},
             "execute_via_ssh": True,
         }
-        inst = mock.MagicMock()
         with expectation:
             with mock.patch.object(cloud, "init") as lxd_init:
-                lxd_init.return_value = inst
                 inst = cloud.launch(**init_kwargs)
+                assert lxd_init.return_value == inst
                 assert lxd_init.call_args_list == [
                     mock.call(
                         name="name",
@@ -70,15 +70,67 @@ class TestLaunch:
                         config_dict={"user.custom": "val"},
                         execute_via_ssh=True,
                         username=None,
+                        start=True,
                     )
                 ]
-                # pylint: disable=no-member
-                assert inst.start.call_args_list == [mock.call(wait=False)]
-                # pylint: disable=no-member
 
         if not image_id:
             assert lxd_init.call_count == 0
-            assert inst.start.call_count == 0
+
+    @mock.patch("pycloudlib.lxd.instance.subp")
+    @mock.patch(M_PATH + "subp")
+    @mock.patch(M_PATH + "_images.find_release", return_value="jammy")
+    def test_launch_inits_then_starts(self, _m_find_release, m_subp, m_instance_subp):
+        """Test the instance is initialized, then started without waiting."""
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+        cloud.key_pair = None
+        inst = cloud.launch("ubuntu:jammy", name="name")
+
+        assert [mock.call(["lxc", "init", "ubuntu:jammy", "name"])] == m_subp.call_args_list
+        assert [mock.call(["lxc", "start", "name"])] == m_instance_subp.call_args_list
+        assert "name" == inst.name
+        assert [inst] == cloud.created_instances
+
+    @mock.patch(M_PATH + "subp")
+    @mock.patch(M_PATH + "_images.find_release", return_value="jammy")
+    def test_failed_init_deletes_nothing(self, _m_find_release, m_subp):
+        """Test an existing instance of the same name is left alone."""
+        m_subp.side_effect = RuntimeError("Failure (rc=1): Instance name is already in use")
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+        cloud.key_pair = None
+        with pytest.raises(RuntimeError, match="already in use"):
+            cloud.launch("ubuntu:jammy", name="name")
+
+        assert [mock.call(["lxc", "init", "ubuntu:jammy", "name"])] == m_subp.call_args_list
+        assert [] == cloud.created_instances
+
+    @mock.patch("pycloudlib.lxd.instance.subp")
+    @mock.patch(M_PATH + "subp")
+    @mock.patch(M_PATH + "_images.find_release", return_value="jammy")
+    def test_unnamed_instance_started_once_tracked(self, _m_find_release, m_subp, m_instance_subp):
+        """Test unnamed instances are tracked before being started."""
+        m_subp.return_value = "Creating the instance\nInstance name is: generated-name"
+        m_instance_subp.side_effect = RuntimeError("Failure (rc=1): failed to start")
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+        cloud.key_pair = None
+        with pytest.raises(RuntimeError, match="failed to start"):
+            cloud.init(None, "ubuntu:jammy", start=True)
+
+        assert [mock.call(["lxc", "init", "ubuntu:jammy"])] == m_subp.call_args_list
+        assert [mock.call(["lxc", "start", "generated-name"])] == m_instance_subp.call_args_list
+        assert ["generated-name"] == [inst.name for inst in cloud.created_instances]
+
+    @mock.patch(M_PATH + "subp")
+    @mock.patch(M_PATH + "_images.find_release", return_value="jammy")
+    def test_generated_name_parsed_from_its_line(self, _m_find_release, m_subp):
+        """Test only the line giving the instance name is parsed."""
+        m_subp.return_value = (
+            "Creating the instance\nInstance name is: generated-name\nStarting generated-name"
+        )
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+        cloud.key_pair = None
+
+        assert "generated-name" == cloud.init(None, "ubuntu:jammy").name
 
 
 @pytest.mark.mock_ssh_keys
@@ -88,23 +140,19 @@ class TestProfileCreation:
     @mock.patch("pycloudlib.lxd.cloud.subp")
     def test_create_profile_that_already_exists(self, m_subp, caplog):
         """Tests creating a profile that already exists."""
-        m_subp.return_value = """
-            - name: test_profile
-        """
+        m_subp.return_value = "default,Default LXD profile,1\ntest_profile,,0\n"
         cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
 
         cloud.create_profile(profile_name="test_profile", profile_config="profile_config")
 
         expected_msg = "The profile named test_profile already exists"
         assert expected_msg in caplog.text
-        assert m_subp.call_args_list == [mock.call(["lxc", "profile", "list", "--format", "yaml"])]
+        assert m_subp.call_args_list == [mock.call(["lxc", "profile", "list", "--format=csv"])]
 
     @mock.patch("pycloudlib.lxd.cloud.subp")
     def test_create_profile_that_already_exists_with_force(self, m_subp):
         """Tests creating an existing profile with force parameter."""
-        m_subp.return_value = """
-            - name: test_profile
-        """
+        m_subp.return_value = "default,Default LXD profile,1\ntest_profile,,0\n"
         cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
         profile_name = "test_profile"
         profile_config = "profile_config"
@@ -116,7 +164,6 @@ class TestProfileCreation:
         )
 
         assert m_subp.call_args_list == [
-            mock.call(["lxc", "profile", "list", "--format", "yaml"]),
             mock.call(["lxc", "profile", "delete", profile_name]),
             mock.call(["lxc", "profile", "create", profile_name]),
             mock.call(["lxc", "profile", "edit", profile_name], data=profile_config),
@@ -125,9 +172,7 @@ class TestProfileCreation:
     @mock.patch("pycloudlib.lxd.cloud.subp")
     def test_create_profile_that_does_not_exist(self, m_subp):
         """Tests creating a new profile."""
-        m_subp.return_value = """
-            - name: other_profile
-        """
+        m_subp.return_value = "other_profile,,0\n"
         cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
         profile_name = "other_profile_v1"
         profile_config = "profile_config"
@@ -135,11 +180,39 @@ class TestProfileCreation:
         cloud.create_profile(profile_name=profile_name, profile_config=profile_config)
 
         assert m_subp.call_args_list == [
-            mock.call(["lxc", "profile", "list", "--format", "yaml"]),
+            mock.call(["lxc", "profile", "list", "--format=csv"]),
             mock.call(["lxc", "profile", "create", profile_name]),
             mock.call(["lxc", "profile", "edit", profile_name], data=profile_config),
         ]
 
+    @mock.patch("pycloudlib.lxd.cloud.subp")
+    def test_create_profile_lists_profiles_once(self, m_subp):
+        """Tests profiles are listed once, and remember created profiles."""
+        m_subp.return_value = "default,Default LXD profile,1\n"
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+
+        cloud.create_profile(profile_name="new_profile", profile_config="profile_config")
+        cloud.create_profile(profile_name="new_profile", profile_config="profile_config")
+        cloud.create_profile(profile_name="default", profile_config="profile_config")
+
+        assert [
+            mock.call(["lxc", "profile", "list", "--format=csv"]),
+            mock.call(["lxc", "profile", "create", "new_profile"]),
+            mock.call(["lxc", "profile", "edit", "new_profile"], data="profile_config"),
+        ] == m_subp.call_args_list
+
+        cloud.invalidate_profile_cache()
+        cloud.create_profile(profile_name="default", profile_config="profile_config")
+        assert 4 == m_subp.call_count
+
+    @mock.patch("pycloudlib.lxd.cloud.subp")
+    def test_profiles_with_multiline_description(self, m_subp):
+        """Tests lines of quoted descriptions aren't taken for profiles."""
+        m_subp.return_value = 'default,"Default\nother,profile",1\nvm,VM profile,0\n'
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+
+        assert {"default", "vm"} == cloud._get_profiles()
+
 
 @pytest.mark.mock_ssh_keys
 class TestReleaseImage:
@@ -259,3 +332,195 @@ class TestDailyImage:
         cloud = cloud_cls(tag="test", config_file=io.StringIO(CONFIG))
         assert "1234" == cloud.daily_image(**kwargs)
         find_last_fingerprint.assert_called_once_with(**expected_kwargs)
+
+
+@pytest.mark.mock_ssh_keys
+class TestPrepareCommand:
+    """Tests covering pycloudlib.lxd.cloud._prepare_command."""
+
+    def test_all_options(self):
+        """Test every option is passed to lxc init."""
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+        cloud.key_pair = None
+        cmd = cloud._prepare_command(  # pylint: disable=protected-access
+            name="name",
+            image_id="ubuntu:jammy",
+            ephemeral=True,
+            network="net",
+            storage="pool",
+            inst_type="c1",
+            profile_list=["p1", "p2"],
+            user_data="ud",
+            config_dict={"k1": "v1", "k2": "v2"},
+        )
+        assert [
+            "lxc",
+            "init",
+            "ubuntu:jammy",
+            "name",
+            "--ephemeral",
+            "--network",
+            "net",
+            "--storage",
+            "pool",
+            "--type",
+            "c1",
+            "--profile",
+            "p1",
+            "--profile",
+            "p2",
+            "--config",
+            "k1=v1",
+            "--config",
+            "k2=v2",
+            "--config",
+            "user.user-data=ud",
+        ] == cmd
+
+
+@pytest.mark.mock_ssh_keys
+class TestDeleteMany:
+    """Tests covering pycloudlib.lxd.cloud.delete_{instances,images}."""
+
+    @mock.patch("pycloudlib.lxd.instance.subp")
+    def test_delete_instances(self, m_subp):
+        """Test every instance is deleted and failures are collected."""
+        error = RuntimeError("Failure (rc=1): Error: permission denied")
+
+        def subp(cmd):
+            if cmd[2] == "bad":
+                raise error
+
+        m_subp.side_effect = subp
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+
+        assert [error] == cloud.delete_instances(["good", "bad", "gone"], wait=False)
+        assert sorted(
+            [
+                mock.call(["lxc", "delete", "good", "--force"]),
+                mock.call(["lxc", "delete", "bad", "--force"]),
+                mock.call(["lxc", "delete", "gone", "--force"]),
+            ],
+            key=str,
+        ) == sorted(m_subp.call_args_list, key=str)
+
+    @mock.patch(M_PATH + "subp")
+    def test_delete_images(self, m_subp):
+        """Test every image is deleted and failures are collected."""
+        error = RuntimeError("Failure (rc=1): Error: not found")
+
+        def subp(cmd):
+            if cmd[3] == "bad":
+                raise error
+
+        m_subp.side_effect = subp
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+
+        assert [error] == cloud.delete_images(["good", "bad"])
+        assert 2 == m_subp.call_count
+
+
+@pytest.mark.mock_ssh_keys
+class TestLaunchMany:
+    """Tests covering pycloudlib.lxd.cloud.launch_many."""
+
+    @pytest.mark.parametrize("wait", (True, False))
+    @mock.patch("pycloudlib.lxd.instance.LXDInstance.wait")
+    @mock.patch(M_PATH + "_images")
+    @mock.patch(M_PATH + "subp")
+    def test_launch_many(self, m_subp, _m_images, m_wait, wait):
+        """Test instances are initialized, then started with one lxc call."""
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+        cloud.key_pair = None
+
+        instances = cloud.launch_many(
+            [{"name": "first", "image_id": "jammy"}, {"image_id": "noble"}], wait=wait
+        )
+
+        assert "first" == instances[0].name
+        assert instances[1].name.startswith("test-")
+        assert all(instance in cloud.created_instances for instance in instances)
+        init_calls, start_calls = m_subp.call_args_list[:2], m_subp.call_args_list[2:]
+        assert ["init", "init"] == [call.args[0][1] for call in init_calls]
+        assert [mock.call(["lxc", "start", "first", instances[1].name])] == start_calls
+        assert (2 if wait else 0) == m_wait.call_count
+
+    @mock.patch("pycloudlib.lxd.instance.LXDInstance.wait")
+    @mock.patch(M_PATH + "_images")
+    @mock.patch(M_PATH + "subp")
+    def test_launch_many_vms_create_profile_once(self, m_subp, m_images, _m_wait):
+        """Test VMs launched together create their shared profile once."""
+        m_images.find_release.return_value = "jammy"
+        m_subp.return_value = ""
+        cloud = LXDVirtualMachine(tag="test", config_file=io.StringIO(CONFIG))
+        cloud.key_pair = None
+
+        cloud.launch_many([{"image_id": "jammy"}] * 4, max_workers=4)
+
+        assert ["pycloudlib-vm-default"] == cloud.created_profiles
+        assert 1 == m_subp.call_args_list.count(
+            mock.call(["lxc", "profile", "create", "pycloudlib-vm-default"])
+        )
+
+    @mock.patch(M_PATH + "subp")
+    def test_launch_many_nothing(self, m_subp):
+        """Test nothing is started without specs."""
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+
+        assert [] == cloud.launch_many([])
+        assert [] == m_subp.call_args_list
+
+
+class TestAsync:
+    """Tests covering the async variants of pycloudlib.lxd.cloud methods."""
+
+    def test_alaunch(self):
+        """Test awaited launches are run with their arguments."""
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+
+        async def launch_all():
+            return await asyncio.gather(
+                cloud.alaunch("jammy"),
+                cloud.alaunch("noble", name="named", ephemeral=True),
+            )
+
+        with mock.patch.object(
+            cloud, "launch", side_effect=lambda image_id, **kwargs: (image_id, kwargs)
+        ):
+            assert [
+                ("jammy", {}),
+                ("noble", {"name": "named", "ephemeral": True}),
+            ] == asyncio.run(launch_all())
+
+    def test_aclone_and_adelete_instance(self):
+        """Test clone and delete_instance are awaitable."""
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+
+        with mock.patch.multiple(cloud, clone=mock.DEFAULT, delete_instance=mock.DEFAULT) as mocks:
+            asyncio.run(cloud.aclone("base", "copy"))
+            asyncio.run(cloud.adelete_instance("copy", wait=False))
+
+        assert [mock.call("base", "copy")] == mocks["clone"].call_args_list
+        assert [mock.call("copy", False)] == mocks["delete_instance"].call_args_list
+
+
+class TestClean:
+    """Tests covering pycloudlib.lxd.cloud.clean."""
+
+    @mock.patch(M_PATH + "subp_many")
+    def test_clean_deletes_snapshots_and_profiles(self, m_subp_many):
+        """Test snapshots and profiles are deleted together, ignoring missing ones."""
+        error = RuntimeError("Failure (rc=1): Error: permission denied")
+        m_subp_many.side_effect = [
+            [RuntimeError("Failure (rc=1): Error: Image not found"), error],
+            [RuntimeError("Failure (rc=1): Error: Profile not found")],
+        ]
+        cloud = LXDContainer(tag="test", config_file=io.StringIO(CONFIG))
+        cloud.created_snapshots = ["gone", "bad"]
+        cloud.created_profiles = ["profile"]
+
+        assert [error] == cloud.clean()
+        assert [
+            mock.call([["lxc", "image", "delete", "gone"], ["lxc", "image", "delete", "bad"]]),
+            mock.call([["lxc", "profile", "delete", "profile"]]),
+        ] == m_subp_many.call_args_list
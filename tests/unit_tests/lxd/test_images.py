@@ -11,35 +11,35 @@ from pycloudlib.lxd import _images
 M_PATH = "pycloudlib.lxd._images."
 
 
+@pytest.fixture(autouse=True)
+def clear_image_cache():
+    """Don't reuse images found between tests."""
+    _images.invalidate_image_cache()
+    yield
+    _images.invalidate_image_cache()
+
+
 @mock.patch(M_PATH + "subp")
 class TestImages:  # pylint: disable=W0212
     """Test class for _images."""
 
     @pytest.mark.parametrize(
-        "images",
+        "image_id,image,expected_image_id,expected_result",
         (
-            [],
-            [{"properties": {"serial": "s0"}}],
-            [
-                {"properties": {"serial": "s0"}},
-                {"properties": {"serial": "s1"}},
-            ],
+            ("my:image_id", None, "my:image_id", None),
+            ("my:image_id", {"properties": {"serial": "s0"}}, "my:image_id", "s0"),
+            ("image_id", {"properties": {"serial": "s0"}}, "ubuntu-daily:image_id", "s0"),
         ),
     )
-    @mock.patch(M_PATH + "_find_images")
-    def test_find_image_serial(self, m_find_images, m_subp, images):
+    @mock.patch(M_PATH + "_show_image")
+    def test_find_image_serial(
+        self, m_show_image, m_subp, image_id, image, expected_image_id, expected_result
+    ):
         """Test find_image_serial method."""
-        image_id = "my:image_id"
-        mock.Mock()
-        if not images:
-            expected_result = None
-        else:
-            expected_result = "s0"
-
-        m_find_images.return_value = images
+        m_show_image.return_value = image
         assert expected_result == _images.find_image_serial(image_id)
 
-        assert [mock.call("my", (("fingerprint", "image_id"),))] == m_find_images.call_args_list
+        assert [mock.call(expected_image_id)] == m_show_image.call_args_list
         assert [] == m_subp.call_args_list
 
     @pytest.mark.parametrize(
@@ -81,6 +81,60 @@ class TestImages:  # pylint: disable=W0212
         assert content == _images._find_images(remote, filters)
         assert [expected_call] == m_subp.call_args_list
 
+    @pytest.mark.parametrize(
+        "error",
+        [
+            "Failure (rc=1): Error: read: connection reset by peer",
+            "Failure (rc=1): Error: Failed to fetch: 503 Service Unavailable",
+        ],
+    )
+    @mock.patch(M_PATH + "time.sleep")
+    def test_find_images_retries_transient_errors(self, m_sleep, m_subp, error):
+        """Test transient failures to list images are retried with backoff."""
+        m_subp.side_effect = [
+            RuntimeError(error),
+            json.dumps(["image_0"]),
+        ]
+        assert ["image_0"] == _images._find_images("remote")
+        assert 2 == m_subp.call_count
+        assert 1 == m_sleep.call_count
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            "Failure (rc=1): Error: The remote doesn't exist",
+            "Failure (rc=1): Error: Image 'ubuntu:a503f2c1' not found",
+            "Failure (rc=1): Error: Image '5021d9e0' not found",
+        ],
+    )
+    @mock.patch(M_PATH + "time.sleep")
+    def test_find_images_raises_other_errors(self, m_sleep, m_subp, error):
+        """Test other failures to list images are raised at once."""
+        m_subp.side_effect = RuntimeError(error)
+        with pytest.raises(RuntimeError):
+            _images._find_images("remote")
+        assert 1 == m_subp.call_count
+        assert 0 == m_sleep.call_count
+
+    def test_find_images_cached(self, m_subp):
+        """Test images are listed once until the cache is invalidated."""
+        m_subp.return_value = json.dumps(["image_0"])
+        filters = [("release", "jammy")]
+        for remote in ("remote", "remote:"):
+            assert ["image_0"] == _images._find_images(remote, filters)
+        assert 1 == m_subp.call_count
+
+        _images.invalidate_image_cache()
+        assert ["image_0"] == _images._find_images("remote", filters)
+        assert 2 == m_subp.call_count
+
+        # Listed again once stale
+        key = ("remote:", tuple(filters))
+        images, listed_at = _images._image_cache[key]
+        _images._image_cache[key] = (images, listed_at - _images._IMAGE_CACHE_MAX_AGE)
+        assert ["image_0"] == _images._find_images("remote", filters)
+        assert 3 == m_subp.call_count
+
     @pytest.mark.parametrize(
         ["remote_in", "remote_out"],
         (
@@ -106,17 +160,31 @@ class TestImages:  # pylint: disable=W0212
             ([{"properties": {"os": "ubuntu", "x": "lunar"}}], None),
         ),
     )
-    @mock.patch(M_PATH + "_find_images")
-    def test_find_release(self, m_find_images, m_subp, images, output):
+    @mock.patch(M_PATH + "_show_image")
+    def test_find_release(self, m_show_image, m_subp, images, output):
         """Test find_release method."""
-        m_find_images.return_value = images
+        m_show_image.return_value = images[0] if images else None
         assert output == _images.find_release("remote:image_id")
+        assert [mock.call("remote:image_id")] == m_show_image.call_args_list
         assert [] == m_subp.call_args_list
 
+    def test_show_image(self, m_subp):
+        """Test a single image is shown rather than listing images."""
+        m_subp.return_value = "properties:\n  os: ubuntu\n  release: jammy\n"
+        for _ in range(2):
+            assert {"properties": {"os": "ubuntu", "release": "jammy"}} == _images._show_image(
+                "ubuntu:jammy"
+            )
+        assert [mock.call(["lxc", "image", "show", "ubuntu:jammy"])] == m_subp.call_args_list
+
+    def test_show_image_not_found(self, m_subp):
+        """Test showing an unknown image returns None."""
+        m_subp.side_effect = RuntimeError("Failure (rc=1): Error: Image not found")
+        assert _images._show_image("ubuntu:unknown") is None
+
     @pytest.mark.parametrize(
         [
-            "images",
-            "n_find_images_calls",
+            "image_type",
             "is_container",
             "daily",
             "is_minimal",
@@ -124,105 +192,17 @@ class TestImages:  # pylint: disable=W0212
             "expected_output",
         ],
         (
-            (
-                [{"fingerprint": "asdf", "type": "container"}],
-                1,
-                True,
-                True,
-                False,
-                "daily",
-                "ubuntu-daily:asdf",
-            ),
-            (
-                [{"fingerprint": "asdf", "type": "squashfs"}],
-                2,
-                True,
-                True,
-                False,
-                "daily",
-                "ubuntu-daily:asdf",
-            ),
-            (
-                [{"fingerprint": "asdf", "type": "unknown"}],
-                2,
-                True,
-                True,
-                False,
-                "daily",
-                None,
-            ),
-            (
-                [{"fingerprint": "asdf", "type": "virtual-machine"}],
-                1,
-                False,
-                True,
-                False,
-                "daily",
-                "ubuntu-daily:asdf",
-            ),
-            (
-                [{"fingerprint": "asdf", "type": "disk-kvm.img"}],
-                2,
-                False,
-                True,
-                False,
-                "daily",
-                "ubuntu-daily:asdf",
-            ),
-            (
-                [{"fingerprint": "asdf", "type": "disk1.img"}],
-                3,
-                False,
-                True,
-                False,
-                "daily",
-                "ubuntu-daily:asdf",
-            ),
-            (
-                [{"fingerprint": "asdf", "type": "uefi1.img"}],
-                4,
-                False,
-                True,
-                False,
-                "daily",
-                "ubuntu-daily:asdf",
-            ),
-            (
-                [{"fingerprint": "asdf", "type": "uefi1.img"}],
-                4,
-                False,
-                False,
-                False,
-                "release",
-                "ubuntu:asdf",
-            ),
-            (
-                [{"fingerprint": "asdf", "type": "uefi1.img"}],
-                4,
-                False,
-                True,
-                True,
-                "minimal daily",
-                "ubuntu-minimal-daily:asdf",
-            ),
-            (
-                [{"fingerprint": "asdf", "type": "uefi1.img"}],
-                4,
-                False,
-                False,
-                True,
-                "minimal release",
-                "ubuntu-minimal:asdf",
-            ),
-            (
-                [{"fingerprint": "asdf", "type": "unknown"}],
-                4,
-                False,
-                True,
-                False,
-                "daily",
-                None,
-            ),
+            ("container", True, True, False, "daily", "ubuntu-daily:asdf"),
+            ("squashfs", True, True, False, "daily", "ubuntu-daily:asdf"),
+            ("unknown", True, True, False, "daily", None),
+            ("virtual-machine", False, True, False, "daily", "ubuntu-daily:asdf"),
+            ("disk-kvm.img", False, True, False, "daily", "ubuntu-daily:asdf"),
+            ("disk1.img", False, True, False, "daily", "ubuntu-daily:asdf"),
+            ("uefi1.img", False, True, False, "daily", "ubuntu-daily:asdf"),
+            ("uefi1.img", False, False, False, "release", "ubuntu:asdf"),
+            ("uefi1.img", False, True, True, "minimal daily", "ubuntu-minimal-daily:asdf"),
+            ("uefi1.img", False, False, True, "minimal release", "ubuntu-minimal:asdf"),
+            ("unknown", False, True, False, "daily", None),
         ),
     )
     @mock.patch(M_PATH + "_find_images")
@@ -230,8 +210,7 @@ class TestImages:  # pylint: disable=W0212
         self,
         m_find_images,
         m_subp,
-        images,
-        n_find_images_calls,
+        image_type,
         daily,
         is_container,
         is_minimal,
@@ -239,16 +218,15 @@ class TestImages:  # pylint: disable=W0212
         expected_output,
     ):
         """Test find_last_fingerprint method."""
-
-        def find_images(remote, filters=None):
-            # pylint: disable=unused-argument
-            filters_map = dict(filters)
-            return list(filter(lambda img: img["type"] == filters_map["type"], images))
-
-        m_find_images.side_effect = find_images
-
         release = "bionic"
         arch = "amd64"
+        m_find_images.return_value = [
+            {
+                "fingerprint": "asdf",
+                "type": image_type,
+                "properties": {"release": release, "label": expected_label},
+            },
+        ]
         if is_minimal:
             find_fingerprint_kwargs = {"image_type": ImageType.MINIMAL}
             expected_remote = "ubuntu-minimal-daily:" if daily else "ubuntu-minimal:"
@@ -256,73 +234,63 @@ class TestImages:  # pylint: disable=W0212
             find_fingerprint_kwargs = {}
             expected_remote = "ubuntu-daily:" if daily else "ubuntu:"
 
-        expected_find_images_calls = [
+        assert expected_output == _images.find_last_fingerprint(
+            daily, release, is_container, arch, **find_fingerprint_kwargs
+        )
+        assert [
             mock.call(
                 expected_remote,
-                (
-                    ("architecture", arch),
-                    ("release", release),
-                    ("label", expected_label),
-                    (
-                        "type",
-                        "container" if is_container else "virtual-machine",
-                    ),
-                ),
+                (("architecture", arch), ("release", release), ("label", expected_label)),
             )
+        ] == m_find_images.call_args_list
+        assert [] == m_subp.call_args_list
+
+    @mock.patch(M_PATH + "_find_images")
+    def test_find_last_fingerprint_fallback_preference(self, m_find_images, _m_subp):
+        """Test VM fallback image types are taken in order of preference."""
+        properties = {"release": "bionic", "label": "release"}
+        m_find_images.return_value = [
+            {"fingerprint": "uefi1", "type": "uefi1.img", "properties": properties},
+            {"fingerprint": "disk1", "type": "disk1.img", "properties": properties},
         ]
-        if is_container:
-            if n_find_images_calls >= 2:
-                expected_find_images_calls.append(
-                    mock.call(
-                        expected_remote,
-                        (
-                            ("architecture", arch),
-                            ("release", release),
-                            ("label", expected_label),
-                            ("type", "squashfs"),
-                        ),
-                    )
-                )
-        else:
-            if n_find_images_calls >= 2:
-                expected_find_images_calls.append(
-                    mock.call(
-                        expected_remote,
-                        (
-                            ("architecture", arch),
-                            ("release", release),
-                            ("label", expected_label),
-                            ("type", "disk-kvm.img"),
-                        ),
-                    )
-                )
-            if n_find_images_calls >= 3:
-                expected_find_images_calls.append(
-                    mock.call(
-                        expected_remote,
-                        (
-                            ("architecture", arch),
-                            ("release", release),
-                            ("label", expected_label),
-                            ("type", "disk1.img"),
-                        ),
-                    )
-                )
-            if n_find_images_calls >= 4:
-                expected_find_images_calls.append(
-                    mock.call(
-                        expected_remote,
-                        (
-                            ("architecture", arch),
-                            ("release", release),
-                            ("label", expected_label),
-                            ("type", "uefi1.img"),
-                        ),
-                    )
-                )
 
-        assert expected_output == _images.find_last_fingerprint(
-            daily, release, is_container, arch, **find_fingerprint_kwargs
+        assert "ubuntu:disk1" == _images.find_last_fingerprint(False, "bionic", False, "amd64")
+
+    def test_find_last_fingerprint_fallback_lists_images_once(self, m_subp):
+        """Test falling back to older VM image types lists the images once."""
+        m_subp.return_value = json.dumps(
+            [{"fingerprint": "disk1", "type": "disk1.img", "properties": {}}]
         )
-        assert expected_find_images_calls == m_find_images.call_args_list
-        assert [] == m_subp.call_args_list
+
+        for _ in range(2):
+            assert "ubuntu:disk1" == _images.find_last_fingerprint(False, "bionic", False, "amd64")
+        assert 1 == m_subp.call_count
+
+    @pytest.mark.parametrize("release", ["jam", "jammy|noble", "^jam"])
+    def test_find_last_fingerprint_partial_release(self, m_subp, release):
+        """Test releases are matched by lxc, e.g. as regular expressions."""
+        m_subp.return_value = json.dumps(
+            [
+                {
+                    "fingerprint": "asdf",
+                    "type": "container",
+                    "properties": {"release": "jammy", "label": "daily"},
+                }
+            ]
+        )
+
+        assert "ubuntu-daily:asdf" == _images.find_last_fingerprint(True, release, True, "amd64")
+        assert [
+            mock.call(
+                [
+                    "lxc",
+                    "image",
+                    "list",
+                    "ubuntu-daily:",
+                    "--format=json",
+                    "architecture=amd64",
+                    f"release={release}",
+                    "label=daily",
+                ]
+            )
+        ] == m_subp.call_args_list
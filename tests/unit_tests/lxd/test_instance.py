@@ -664,6 +664,106 @@ class TestRestart:
         assert not m_shutdown.called
 
 
+class TestState:
+    """Tests covering pycloudlib.lxd.instance.Instance.state."""
+
+    @pytest.mark.parametrize(
+        "output,state",
+        (
+            ('{"name": "my_vm", "status": "Running"}', "RUNNING"),
+            ('{"name": "my_vm"}', "Unknown"),
+            ("not json", "Unknown"),
+        ),
+    )
+    @mock.patch("pycloudlib.lxd.instance.subp")
+    def test_state(self, m_subp, output, state):
+        """Test the state is read from the instance's status."""
+        m_subp.return_value = output
+        assert state == LXDInstance(name="my_vm").state
+        assert [mock.call(["lxc", "query", "/1.0/instances/my_vm"])] == m_subp.call_args_list
+
+    @mock.patch("pycloudlib.lxd.instance.subp", return_value='{"status": "Stopped"}')
+    def test_state_of_remote_instance(self, m_subp):
+        """Test instances of a remote are queried on that remote."""
+        assert "STOPPED" == LXDInstance(name="remote:my_vm").state
+        assert [mock.call(["lxc", "query", "remote:/1.0/instances/my_vm"])] == m_subp.call_args_list
+
+    @pytest.mark.parametrize(
+        "output,state",
+        (
+            ("Name: my_vm\nStatus: RUNNING\n", "RUNNING"),
+            ("Name: my_vm\n", "Unknown"),
+        ),
+    )
+    @mock.patch("pycloudlib.lxd.instance.subp")
+    def test_state_falls_back_to_lxc_info(self, m_subp, output, state):
+        """Test lxc info is used for instances lxc query can't find."""
+        m_subp.side_effect = [RuntimeError("Failure (rc=1): Error: Not Found"), output]
+        assert state == LXDInstance(name="my_vm").state
+        assert mock.call(["lxc", "info", "my_vm"]) == m_subp.call_args
+
+    @mock.patch("pycloudlib.lxd.instance.subp")
+    def test_state_without_lxc_query(self, m_subp):
+        """Test lxc info is used by lxc versions lacking the query command."""
+        m_subp.side_effect = [
+            RuntimeError('Failure (rc=1): Error: unknown command "query" for "lxc"'),
+            "Status: STOPPED\n",
+        ]
+        assert "STOPPED" == LXDInstance(name="my_vm").state
+
+    @mock.patch("pycloudlib.lxd.instance.subp")
+    def test_state_query_error_raised(self, m_subp):
+        """Test other lxc query errors are raised without trying lxc info."""
+        m_subp.side_effect = RuntimeError("Failure (rc=1): Error: The remote isn't a LXD server")
+        with pytest.raises(RuntimeError, match="isn't a LXD server"):
+            LXDInstance(name="remote:my_vm").state  # pylint: disable=expression-not-assigned
+        assert 1 == m_subp.call_count
+
+
+class TestStartShutdown:
+    """Tests covering pycloudlib.lxd.instance.Instance.{start,shutdown}."""
+
+    @mock.patch("pycloudlib.lxd.instance.subp")
+    def test_start_without_state_check(self, m_subp):
+        """Test the instance is started without checking its state first."""
+        instance = LXDInstance(name="my_vm")
+        with mock.patch.object(instance, "wait") as m_wait:
+            instance.start()
+        assert [mock.call(["lxc", "start", "my_vm"])] == m_subp.call_args_list
+        assert 1 == m_wait.call_count
+
+    @mock.patch(
+        "pycloudlib.lxd.instance.subp",
+        side_effect=RuntimeError("Failure (rc=1): Error: The instance is already running"),
+    )
+    def test_start_already_running(self, m_subp):
+        """Test starting a running instance doesn't wait for it."""
+        instance = LXDInstance(name="my_vm")
+        with mock.patch.object(instance, "wait") as m_wait:
+            instance.start()
+        assert 1 == m_subp.call_count
+        assert 0 == m_wait.call_count
+
+    @mock.patch(
+        "pycloudlib.lxd.instance.subp",
+        side_effect=RuntimeError("Failure (rc=1): Error: The instance is already stopped"),
+    )
+    def test_shutdown_already_stopped(self, m_subp):
+        """Test stopping a stopped instance doesn't wait for it."""
+        instance = LXDInstance(name="my_vm")
+        with mock.patch.object(instance, "wait_for_stop") as m_wait_for_stop:
+            instance.shutdown()
+        assert [mock.call(["lxc", "stop", "my_vm"])] == m_subp.call_args_list
+        assert 0 == m_wait_for_stop.call_count
+
+    @mock.patch("pycloudlib.lxd.instance.subp", side_effect=RuntimeError("Failure (rc=1)"))
+    def test_shutdown_failure(self, _m_subp):
+        """Test other failures to stop an instance are raised."""
+        instance = LXDInstance(name="my_vm")
+        with pytest.raises(RuntimeError):
+            instance.shutdown()
+
+
 class TestExecute:
     """Tests covering pycloudlib.lxd.instance.Instance.execute."""
 
@@ -681,6 +781,15 @@ class TestExecute:
         assert "exec" in args[0]
         assert kwargs.get("rcs", mock.sentinel.not_none) is None
 
+    def test_execute_many_using_exec(self):
+        """Test that execute_many runs each command with lxc exec."""
+        instance = LXDInstance(None, execute_via_ssh=False)
+        with mock.patch("pycloudlib.lxd.instance.subp") as m_subp:
+            results = instance.execute_many(["true", ["false"]])
+        assert [m_subp.return_value] * 2 == results
+        assert ["sh", "-c", "true"] == m_subp.call_args_list[0].args[0][-3:]
+        assert ["false"] == m_subp.call_args_list[1].args[0][-1:]
+
 
 class TestVirtualMachineXenialAgentOperations:  # pylint: disable=W0212
     """Tests covering pycloudlib.lxd.instance.LXDVirtualMachineInstance."""
@@ -874,3 +983,13 @@ class TestDelete:
         assert 0 == m_shutdown.call_count
         assert 1 == m_subp.call_count
         assert [mock.call(["lxc", "delete", "test", "--force"])] == m_subp.call_args_list
+
+    @mock.patch("pycloudlib.instance._ssh_pool.discard")
+    @mock.patch("pycloudlib.lxd.instance.subp")
+    def test_delete_drops_pooled_connection(self, _m_subp, m_discard):
+        """Test the deleted instance's pooled SSH connection is closed."""
+        instance = LXDInstance(name="test")
+        instance._ssh_pool_key = ("10.0.0.1", "ubuntu", 22, "/tmp/key")
+        instance.delete(wait=False)
+
+        m_discard.assert_called_once_with(("10.0.0.1", "ubuntu", 22, "/tmp/key"))
@@ -12,6 +12,7 @@ import pytest
 
 from pycloudlib import Qemu
 from pycloudlib.errors import ImageNotFoundError, PycloudlibError
+from pycloudlib.qemu import cloud as qemu_cloud
 
 BASIC_CONFIG = """\
 [qemu]
@@ -27,6 +28,14 @@ def common_mocks():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_latest_dates():
+    """Don't reuse release page dates between tests."""
+    qemu_cloud._latest_dates.clear()
+    yield
+    qemu_cloud._latest_dates.clear()
+
+
 @pytest.fixture
 def qemu(tmp_path: Path):
     """Fixture to create a Qemu instance."""
@@ -107,6 +116,25 @@ class TestQemuCloud:
         assert result == str(image1.absolute())
         assert "Image already exists, skipping download" in caplog.text
 
+    @mock.patch(
+        "pycloudlib.qemu.cloud.requests.get",
+        return_value=mock.Mock(text="<title>Ubuntu daily [20231010]</title>"),
+    )
+    def test_latest_date_reused(self, m_get, qemu):
+        """Test the release page is fetched once for many clouds."""
+        for _ in range(3):
+            assert "20231010" == qemu_cloud._get_latest_date("https://none")
+        assert 1 == m_get.call_count
+
+        # Refetched once stale
+        fetched_at = qemu_cloud._latest_dates["https://none"][1]
+        qemu_cloud._latest_dates["https://none"] = (
+            "20231010",
+            fetched_at - qemu_cloud._LATEST_DATE_MAX_AGE,
+        )
+        assert "20231010" == qemu_cloud._get_latest_date("https://none")
+        assert 2 == m_get.call_count
+
     def test_seed_iso_no_data(self, tmp_path: Path, qemu):
         """Test that _create_seed_iso returns None when no data is passed."""
         assert qemu.cloud._create_seed_iso(tmp_path, None, None, None) is None
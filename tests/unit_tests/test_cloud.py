@@ -6,6 +6,7 @@ from textwrap import dedent
 from typing import List, Optional
 
 import mock
+import paramiko
 import pytest
 
 from pycloudlib.cloud import BaseCloud
@@ -59,6 +60,31 @@ class TestBaseCloud:
             )
         assert "Can't instantiate abstract class BaseCloud" in str(exc_info.value)
 
+    @pytest.mark.parametrize(
+        "key_type, key_cls",
+        [
+            pytest.param({}, paramiko.RSAKey, id="default"),
+            pytest.param({"key_type": "rsa"}, paramiko.RSAKey, id="rsa"),
+            pytest.param({"key_type": "ed25519"}, paramiko.Ed25519Key, id="ed25519"),
+        ],
+    )
+    def test_create_key_pair(self, key_type, key_cls):
+        """Test a key pair of the requested type is created."""
+        cloud = CloudSubclass(tag="tag", timestamp_suffix=False, config_file=StringIO(CONFIG))
+
+        pub_key, priv_key = cloud.create_key_pair(**key_type)
+
+        key = key_cls.from_private_key(StringIO(priv_key))
+        assert f"{key.get_name()} {key.get_base64()}" == pub_key
+        assert (pub_key, priv_key) != cloud.create_key_pair(**key_type)
+
+    def test_create_key_pair_unsupported_type(self):
+        """Test unsupported key types are rejected."""
+        cloud = CloudSubclass(tag="tag", timestamp_suffix=False, config_file=StringIO(CONFIG))
+
+        with pytest.raises(ValueError, match="Unsupported key type: dsa"):
+            cloud.create_key_pair(key_type="dsa")
+
     @pytest.mark.parametrize(
         "tag,timestamp_suffix,expected_tag",
         (
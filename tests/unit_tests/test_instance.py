@@ -1,11 +1,22 @@
 """Tests related to pycloudlib.instance module."""
 
+import asyncio
+import logging
+import pathlib
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
 from itertools import repeat
 from unittest import mock
 
+import paramiko
 import pytest
 from paramiko import SSHException
 
+from pycloudlib import _ssh, _ssh_pool
+from pycloudlib import instance as pycloudlib_instance
 from pycloudlib.errors import PycloudlibTimeoutError
 from pycloudlib.instance import BaseInstance
 from pycloudlib.result import Result
@@ -45,6 +56,135 @@ class TestWait:
         assert 1 == mocks["_wait_for_execute"].call_count
         assert 1 == mocks["_wait_for_cloudinit"].call_count
 
+    def test_wait_overlaps_start_and_execute(self, concrete_instance_cls):
+        """Test the instance is reached while waiting for it to start."""
+        instance = concrete_instance_cls(key_pair=None)
+        instance._overlap_start_and_execute = True
+        reached = threading.Event()
+
+        def wait_for_instance_start():
+            assert reached.wait(timeout=5)
+
+        with mock.patch.multiple(
+            instance,
+            _wait_for_instance_start=mock.Mock(side_effect=wait_for_instance_start),
+            _wait_for_execute=mock.Mock(side_effect=lambda **kwargs: reached.set()),
+            _wait_for_cloudinit=mock.DEFAULT,
+        ):
+            instance.wait()
+
+        assert reached.is_set()
+
+    def test_wait_start_failure_stops_execute(self, concrete_instance_cls):
+        """Test waiting to reach the instance stops if it fails to start."""
+        instance = concrete_instance_cls(key_pair=None)
+        instance._overlap_start_and_execute = True
+        with mock.patch.multiple(
+            instance,
+            _wait_for_instance_start=mock.Mock(side_effect=PycloudlibTimeoutError),
+            _wait_for_execute=mock.DEFAULT,
+            _wait_for_cloudinit=mock.DEFAULT,
+        ) as mocks:
+            with pytest.raises(PycloudlibTimeoutError):
+                instance.wait()
+
+        assert mocks["_wait_for_execute"].call_args.kwargs["stop"].is_set()
+        assert 0 == mocks["_wait_for_cloudinit"].call_count
+
+    def test_wait_execute_error_retries_after_start(self, concrete_instance_cls):
+        """Test unexpected errors reaching a starting instance are retried."""
+        instance = concrete_instance_cls(key_pair=None)
+        instance._overlap_start_and_execute = True
+        m_wait_for_execute = mock.Mock(side_effect=[ValueError, None])
+        with mock.patch.multiple(
+            instance,
+            _wait_for_instance_start=mock.DEFAULT,
+            _wait_for_execute=m_wait_for_execute,
+            _wait_for_cloudinit=mock.DEFAULT,
+        ) as mocks:
+            instance.wait()
+
+        assert mock.call(old_boot_id=None) == m_wait_for_execute.call_args
+        assert 2 == m_wait_for_execute.call_count
+        assert 1 == mocks["_wait_for_cloudinit"].call_count
+
+    def test_wait_probe_timeout_before_start_retried(self, concrete_instance_cls):
+        """Test timing out reaching the instance before it started is retried."""
+        instance = concrete_instance_cls(key_pair=None)
+        instance._overlap_start_and_execute = True
+        m_wait_for_execute = mock.Mock(side_effect=[PycloudlibTimeoutError, None])
+        probe: Future = Future()
+
+        def submit(fn, **kwargs):
+            # Let the probe end before waiting for the instance to start
+            try:
+                probe.set_result(fn(**kwargs))
+            except PycloudlibTimeoutError as e:
+                probe.set_exception(e)
+            return probe
+
+        with mock.patch("pycloudlib.instance.ThreadPoolExecutor") as m_executor:
+            m_executor.return_value.__enter__.return_value.submit.side_effect = submit
+            with mock.patch.multiple(
+                instance,
+                _wait_for_instance_start=mock.DEFAULT,
+                _wait_for_execute=m_wait_for_execute,
+                _wait_for_cloudinit=mock.DEFAULT,
+            ) as mocks:
+                instance.wait()
+
+        assert 2 == m_wait_for_execute.call_count
+        assert 1 == mocks["_wait_for_cloudinit"].call_count
+
+    def test_wait_for_execute_stop(self, concrete_instance_cls):
+        """Test setting stop ends waiting between attempts immediately."""
+        instance = concrete_instance_cls(key_pair=None)
+        stop = threading.Event()
+
+        def get_boot_id():
+            stop.set()
+            raise SSHException
+
+        with mock.patch.object(instance, "get_boot_id", side_effect=get_boot_id):
+            with mock.patch(
+                "pycloudlib.instance.backoff_delay", return_value=60
+            ) as m_backoff_delay:
+                instance._wait_for_execute(stop=stop)
+
+        assert 1 == m_backoff_delay.call_count
+
+    def test_wait_for_execute_deadline(self, concrete_instance_cls):
+        """Test waiting stops at the deadline rather than sleeping past it."""
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(instance, "get_boot_id", side_effect=SSHException):
+            with mock.patch("pycloudlib.instance.backoff_delay", return_value=60):
+                start = time.monotonic()
+                with pytest.raises(
+                    PycloudlibTimeoutError,
+                    match="reached after 0 seconds, at the deadline. Failed to obtain",
+                ):
+                    instance._wait_for_execute(deadline=start + 0.1)
+
+        assert time.monotonic() - start < 5
+
+    def test_wait_without_overlap(self, concrete_instance_cls):
+        """Test instances wait to start before trying to reach them by default."""
+        instance = concrete_instance_cls(key_pair=None)
+        manager = mock.Mock()
+        with mock.patch.multiple(
+            instance,
+            _wait_for_instance_start=manager.start,
+            _wait_for_execute=manager.execute,
+            _wait_for_cloudinit=manager.cloudinit,
+        ):
+            instance.wait()
+
+        assert [
+            mock.call.start(),
+            mock.call.execute(old_boot_id=None),
+            mock.call.cloudinit(),
+        ] == manager.mock_calls
+
     @pytest.mark.parametrize(
         "execute_effect",
         [
@@ -53,45 +193,47 @@ class TestWait:
         ],
     )
     @mock.patch.object(BaseInstance, "execute")
-    @mock.patch("pycloudlib.instance.time.sleep")
-    @mock.patch("pycloudlib.instance.time.time")
+    @mock.patch("pycloudlib.instance.backoff_delay", return_value=0)
+    @mock.patch("pycloudlib.instance.time.monotonic")
     @mock.patch("logging.Logger.debug")
     def test_wait_execute_failure(
         self,
         m_debug,
         m_time,
-        m_sleep,
+        m_backoff_delay,
         m_execute,
         execute_effect,
         concrete_instance_cls,
     ):
         """Test wait calls when execute command fails."""
         instance = concrete_instance_cls(key_pair=None)
-        m_time.side_effect = [1, 1, 2, 40 * 60, 40 * 60 + 1]
+        m_time.side_effect = [1, 1, 2, 40 * 60 + 1]
         m_execute.side_effect = execute_effect
         expected_msg = "Instance can't be reached after 40 minutes. Failed to obtain new boot id"
-        expected_call_args = [mock.call("cat /proc/sys/kernel/random/boot_id", no_log=True)] * 2
+        expected_call_args = [
+            mock.call(["cat", "/proc/sys/kernel/random/boot_id"], no_log=True)
+        ] * 2
 
         with pytest.raises(PycloudlibTimeoutError) as excinfo:
             instance.wait()
 
         assert expected_msg == str(excinfo.value)
-        assert m_sleep.call_count == 2
+        assert m_backoff_delay.call_count == 2
         assert expected_call_args == m_execute.call_args_list
 
 
 @mock.patch("pycloudlib.instance.BaseInstance._do_restart")
-@mock.patch("pycloudlib.instance.BaseInstance.get_boot_id")
+@mock.patch("pycloudlib.instance.BaseInstance._sync_and_get_boot_id")
 @mock.patch("pycloudlib.instance.BaseInstance.wait")
 @mock.patch("pycloudlib.instance.BaseInstance.wait_for_restart")
 class TestRestart:
     """Test base restart behavior."""
 
     @pytest.fixture(autouse=True)
-    def unchecked_mocks(self):
+    def m_sync_filesystem(self):
         """Mock things we don't want as test parameters."""
-        with mock.patch("pycloudlib.instance.BaseInstance._sync_filesystem"):
-            yield
+        with mock.patch("pycloudlib.instance.BaseInstance._sync_filesystem") as m_sync:
+            yield m_sync
 
     def test_no_wait(
         self,
@@ -141,6 +283,21 @@ class TestRestart:
         assert m_wait_for_restart.call_count == 1
         assert m_wait.call_count == 0
 
+    def test_sync_and_boot_id_single_command(
+        self,
+        _m_wait_for_restart,
+        _m_wait,
+        m_boot_id,
+        _m_do_restart,
+        m_sync_filesystem,
+        concrete_instance_cls,
+    ):
+        """Test the filesystem is synced along with getting the boot id."""
+        instance = concrete_instance_cls(key_pair=None)
+        instance.restart(wait=True)
+        assert m_boot_id.call_count == 1
+        assert m_sync_filesystem.call_count == 0
+
 
 class TestWaitForRestart:
     """Tests covering pycloudlib.instance.Instance.wait_for_restart."""
@@ -157,10 +314,10 @@ class TestWaitForRestart:
         ],
     )
     @mock.patch.object(BaseInstance, "_wait_for_cloudinit")
-    @mock.patch("pycloudlib.instance.time.sleep")
-    @mock.patch("pycloudlib.instance.time.time", return_value=1)
+    @mock.patch("pycloudlib.instance.backoff_delay", return_value=0)
+    @mock.patch("pycloudlib.instance.time.monotonic", return_value=1)
     def test_wait_for_restart(
-        self, _m_time, _m_sleep, _m_wait_ci, m_execute, concrete_instance_cls
+        self, _m_time, _m_backoff_delay, _m_wait_ci, m_execute, concrete_instance_cls
     ):
         """Test wait calls _wait_for_execute and waits till differing."""
         instance = concrete_instance_cls(key_pair=None)
@@ -175,14 +332,14 @@ class TestWaitForRestart:
         ],
     )
     @mock.patch.object(BaseInstance, "execute")
-    @mock.patch("pycloudlib.instance.time.sleep")
-    @mock.patch("pycloudlib.instance.time.time")
+    @mock.patch("pycloudlib.instance.backoff_delay", return_value=0)
+    @mock.patch("pycloudlib.instance.time.monotonic")
     @mock.patch("logging.Logger.debug")
     def test_boot_id_failure(
         self,
         m_debug,
         m_time,
-        m_sleep,
+        m_backoff_delay,
         m_execute,
         execute_side_effect,
         concrete_instance_cls,
@@ -190,15 +347,17 @@ class TestWaitForRestart:
         """Test wait calls when execute command fails."""
         m_execute.side_effect = execute_side_effect
         instance = concrete_instance_cls(key_pair=None)
-        m_time.side_effect = [1, 1, 2, 40 * 60, 40 * 60 + 1]
+        m_time.side_effect = [1, 1, 2, 40 * 60 + 1]
         expected_msg = "Instance can't be reached after 40 minutes. Failed to obtain new boot id"
-        expected_call_args = [mock.call("cat /proc/sys/kernel/random/boot_id", no_log=True)] * 2
+        expected_call_args = [
+            mock.call(["cat", "/proc/sys/kernel/random/boot_id"], no_log=True)
+        ] * 2
 
         with pytest.raises(PycloudlibTimeoutError) as excinfo:
             instance.wait_for_restart(old_boot_id="11111111-1111-1111-1111-111111111111")
 
         assert expected_msg == str(excinfo.value)
-        assert m_sleep.call_count == 2
+        assert m_backoff_delay.call_count == 2
         assert expected_call_args == m_execute.call_args_list
 
 
@@ -207,44 +366,786 @@ class TestWaitForRestart:
 class TestWaitForCloudinit:
     """Tests covering pycloudlib.instance.Instance._wait_for_cloudinit."""
 
-    def test_with_wait_available(self, concrete_instance_cls):
-        """Test the happy path for instances with `status --wait`."""
+    def test_single_command(self, concrete_instance_cls):
+        """Test the target and status waits happen in a single command."""
         instance = concrete_instance_cls(key_pair=None)
         with mock.patch.object(instance, "execute") as m_execute:
             instance._wait_for_cloudinit()
 
-        assert (
-            mock.call(
-                ["cloud-init", "status", "--wait", "--long"],
-                description="waiting for start",
-            )
-            == m_execute.call_args
+        m_execute.assert_called_once_with(
+            pycloudlib_instance._WAIT_FOR_CLOUDINIT, description="waiting for start"
         )
 
-    @mock.patch("time.sleep")
-    def test_wait_on_target_not_active(self, _m_sleep, concrete_instance_cls):
-        """Test that we wait for cloud-init is-active before calling status."""
+    def test_script(self, tmp_path):
+        """Test the script polls for the target, then waits for cloud-init status."""
+        log = tmp_path / "log"
+        rcs = tmp_path / "rcs"
+        rcs.write_text("1\n1\n0\n")
+        stubs = {
+            "cloud-init": 'echo status >> "$LOG"',
+            "sleep": 'echo sleep >> "$LOG"',
+            "systemctl": (
+                'echo target >> "$LOG"; rc=$(head -n1 "$RCS"); sed -i 1d "$RCS"; exit "$rc"'
+            ),
+        }
+        for name, body in stubs.items():
+            stub = tmp_path / name
+            stub.write_text(f"#!/bin/sh\n{body}\n")
+            stub.chmod(0o755)
+
+        subprocess.run(
+            ["/bin/sh", "-c", pycloudlib_instance._WAIT_FOR_CLOUDINIT],
+            env={"PATH": f"{tmp_path}:/usr/bin:/bin", "LOG": str(log), "RCS": str(rcs)},
+            check=True,
+        )
+        assert [
+            "target",
+            "sleep",
+            "target",
+            "sleep",
+            "target",
+            "status",
+        ] == log.read_text().split()
+
+
+class TestSSH:
+    """Tests covering pycloudlib.instance.Instance._ssh."""
+
+    @mock.patch("pycloudlib._ssh.select.select")
+    def test_interleaved_output_is_drained(self, _m_select, concrete_instance_cls):
+        """Test stdout and stderr are both collected as they arrive."""
+        channel = mock.Mock(closed=False)
+        channel.recv_ready.side_effect = [True, False, True, False, False]
+        channel.recv.side_effect = [b"out1\n", b"out2\n"]
+        channel.recv_stderr_ready.side_effect = [True, False, False, False]
+        channel.recv_stderr.side_effect = [b"err\n"]
+        type(channel).eof_received = mock.PropertyMock(side_effect=[False, True])
+        channel.recv_exit_status.return_value = 3
+        fp_in = mock.Mock(channel=channel)
+        client = mock.Mock()
+        client.exec_command.return_value = (fp_in, mock.Mock(), mock.Mock())
+
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(instance, "_get_ssh_client", return_value=(client, False)):
+            result = instance._ssh(["echo", "hi"])
+
+        assert "out1\nout2" == result.stdout
+        assert "err" == result.stderr
+        assert 3 == result.return_code
+        channel.shutdown_write.assert_called_once_with()
+
+    @mock.patch("pycloudlib._ssh.select.select")
+    @mock.patch("pycloudlib._ssh.shell_pack", return_value="packed")
+    def test_packed_command_is_memoized(self, m_shell_pack, _m_select, concrete_instance_cls):
+        """Test identical commands are only packed once."""
+        _ssh._pack_str_command.cache_clear()
+        channel = mock.Mock()
+        channel.recv_ready.return_value = False
+        channel.recv_stderr_ready.return_value = False
+        channel.recv_exit_status.return_value = 0
+        client = mock.Mock()
+        client.exec_command.return_value = (mock.Mock(channel=channel), None, None)
+
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(instance, "_get_ssh_client", return_value=(client, False)):
+            instance._ssh(["echo", "$HOME"])
+            instance._ssh(["echo", "$HOME"])
+
+        m_shell_pack.assert_called_once_with(["echo", "$HOME"])
+        assert [mock.call("packed", get_pty=False)] * 2 == client.exec_command.call_args_list
+
+    @pytest.mark.parametrize(
+        "command, expected",
+        [
+            (("sudo", "apt-get", "install", "pkg=1.0"), "sudo apt-get install pkg=1.0"),
+            (("cat", "/proc/sys/kernel/random/boot_id"), "cat /proc/sys/kernel/random/boot_id"),
+            (("echo", "a b"), None),
+            (("echo", ""), None),
+            (("echo", "~"), None),
+            (("FOO=bar", "env"), None),
+        ],
+    )
+    @mock.patch("pycloudlib._ssh.shell_pack", return_value="packed")
+    def test_plain_words_not_packed(self, _m_shell_pack, command, expected):
+        """Test commands needing no quoting are sent as they are."""
+        _ssh._pack_str_command.cache_clear()
+        assert (expected or "packed") == _ssh.pack_command(command)
+
+    @mock.patch("pycloudlib._ssh.shell_pack", return_value="packed")
+    def test_non_str_arguments_packed(self, m_shell_pack):
+        """Test commands with arguments other than strings are packed."""
+        _ssh._pack_str_command.cache_clear()
+        assert "packed" == _ssh.pack_command(("cat", pathlib.Path("/tmp/file"), b"x"))
+        m_shell_pack.assert_called_once_with(["cat", pathlib.Path("/tmp/file"), b"x"])
+
+    @mock.patch("pycloudlib.instance._ssh_pool.discard")
+    def test_failed_command_discards_pooled_connection(self, m_discard, concrete_instance_cls):
+        """Test a connection failing to run a command isn't handed out again."""
+        client = mock.Mock()
+        client.exec_command.side_effect = EOFError()
+
+        instance = concrete_instance_cls(key_pair=None)
+        instance._ssh_client = client
+        instance._ssh_pool_key = ("10.0.0.1", "ubuntu", 22, "/tmp/key")
+        with mock.patch.object(instance, "_get_ssh_client", return_value=(client, False)):
+            with pytest.raises(SSHException):
+                instance._ssh(["echo", "hi"])
+
+        m_discard.assert_called_once_with(("10.0.0.1", "ubuntu", 22, "/tmp/key"), client)
+        assert instance._ssh_client is None
+
+    @mock.patch("pycloudlib.instance._ssh_pool.discard")
+    def test_failed_reused_connection_reconnects(self, m_discard, concrete_instance_cls):
+        """Test a command failing on a connection already established runs again."""
+        stale = mock.Mock()
+        stale.exec_command.side_effect = EOFError()
+        fp_in = mock.Mock()
+        fresh = mock.Mock()
+        fresh.exec_command.return_value = (fp_in, mock.Mock(), mock.Mock())
+
         instance = concrete_instance_cls(key_pair=None)
+        instance._ssh_client = stale
+        instance._ssh_pool_key = ("10.0.0.1", "ubuntu", 22, "/tmp/key")
         with mock.patch.object(
-            instance,
-            "execute",
-            side_effect=[Result("", "", 0)] + [Result("", "", 1)] * 500,
-        ) as m_execute:
-            instance._wait_for_cloudinit()
-        expected = [
-            mock.call("command -v systemctl"),
-            *(
-                [
-                    mock.call(
-                        ["systemctl", "is-active", "cloud-init.target"],
-                        no_log=True,
-                    )
-                ]
-                * 300
+            instance, "_get_ssh_client", side_effect=[(stale, True), (fresh, False)]
+        ):
+            assert instance._ssh_submit("echo hi") is fp_in.channel
+
+        m_discard.assert_called_once_with(("10.0.0.1", "ubuntu", 22, "/tmp/key"), stale)
+        fresh.exec_command.assert_called_once_with("echo hi", get_pty=False)
+
+
+@mock.patch("pycloudlib.instance.uuid.uuid4", return_value=mock.Mock(hex="tag"))
+@mock.patch("pycloudlib._ssh.select.select")
+class TestSSHPersistent:
+    """Tests covering pycloudlib.instance.Instance._ssh with a persistent shell."""
+
+    @pytest.fixture
+    def channel(self):
+        """Return a channel replying as the remote shell would."""
+        channel = mock.Mock(closed=False, eof_received=False)
+        channel.exit_status_ready.return_value = False
+        channel.recv_ready.side_effect = [True, False] * 2
+        channel.recv_stderr_ready.side_effect = [True, False] * 2
+        channel.recv.return_value = b"out\n\n__pycloudlib_tag__:3\n"
+        channel.recv_stderr.return_value = b"err\n\n__pycloudlib_tag__\n"
+        return channel
+
+    def test_command_runs_in_persistent_shell(
+        self, _m_select, _m_uuid, channel, concrete_instance_cls
+    ):
+        """Test commands are sent to a single shell and delimited by markers."""
+        client = mock.Mock()
+        client.get_transport.return_value.open_session.return_value = channel
+        instance = concrete_instance_cls(key_pair=None)
+        instance.persistent_shell = True
+        with mock.patch.object(instance, "_ssh_connect", return_value=client):
+            assert Result("out", "err", 3) == instance._ssh(["whoami"])
+            instance._ssh(["whoami"])
+
+        channel.exec_command.assert_called_once_with("sh")
+        assert 0 == client.exec_command.call_count
+        script = channel.sendall.call_args.args[0].decode()
+        assert script.startswith("( ")
+        assert "__pycloudlib_tag__:%d" in script
+
+    def test_stdin_falls_back_to_exec_command(
+        self, _m_select, _m_uuid, channel, concrete_instance_cls
+    ):
+        """Test a command with stdin is run on its own channel."""
+        client = mock.Mock()
+        channel.recv_ready.side_effect = None
+        channel.recv_ready.return_value = False
+        channel.recv_stderr_ready.side_effect = None
+        channel.recv_stderr_ready.return_value = False
+        channel.eof_received = True
+        channel.recv_exit_status.return_value = 0
+        client.exec_command.return_value = (mock.Mock(channel=channel), None, None)
+        instance = concrete_instance_cls(key_pair=None)
+        instance.persistent_shell = True
+        with mock.patch.object(instance, "_get_ssh_client", return_value=(client, False)):
+            instance._ssh(["cat"], stdin="content")
+
+        assert 1 == client.exec_command.call_count
+        assert 0 == client.get_transport.return_value.open_session.call_count
+
+
+@mock.patch.object(BaseInstance, "ip", new_callable=mock.PropertyMock, return_value="10.0.0.1")
+@mock.patch("pycloudlib.instance.paramiko")
+class TestSSHConnect:
+    """Tests covering pycloudlib.instance.Instance._ssh_connect."""
+
+    @pytest.fixture(autouse=True)
+    def empty_pool(self):
+        """Ensure no pooled connection leaks between tests."""
+        _ssh_pool.close_all()
+        yield
+        _ssh_pool.close_all()
+
+    def test_connect(self, m_paramiko, _m_ip, concrete_instance_cls):
+        """Test a new connection is established with keepalives enabled."""
+        instance = concrete_instance_cls(key_pair=mock.Mock(private_key_path="/tmp/key"))
+        client = instance._ssh_connect()
+
+        assert m_paramiko.SSHClient.return_value == client
+        assert "10.0.0.1" == client.connect.call_args.kwargs["hostname"]
+        assert 22 == client.connect.call_args.kwargs["port"]
+        transport = client.get_transport.return_value
+        transport.set_keepalive.assert_called_once_with(30)
+        transport.sock.setsockopt.assert_called_once_with(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def test_reuse_active_connection(self, m_paramiko, _m_ip, concrete_instance_cls):
+        """Test an active connection is reused."""
+        instance = concrete_instance_cls(key_pair=mock.Mock(private_key_path="/tmp/key"))
+        client = instance._ssh_connect()
+        client.get_transport.return_value.is_active.return_value = True
+
+        assert client == instance._ssh_connect()
+        assert 1 == m_paramiko.SSHClient.call_count
+
+    def test_connection_checked_on_reuse(self, m_paramiko, _m_ip, concrete_instance_cls):
+        """Test connections are checked every time they are reused."""
+        instance = concrete_instance_cls(key_pair=mock.Mock(private_key_path="/tmp/key"))
+        client, reused = instance._get_ssh_client()
+        assert not reused
+        is_active = client.get_transport.return_value.is_active
+        is_active.return_value = True
+
+        for _ in range(2):
+            assert (client, True) == instance._get_ssh_client()
+        assert 2 == is_active.call_count
+
+    def test_closed_connection_replaced(self, m_paramiko, _m_ip, concrete_instance_cls):
+        """Test a connection closed since it was last used is replaced."""
+        m_paramiko.SSHClient.side_effect = lambda: mock.Mock()
+        instance = concrete_instance_cls(key_pair=mock.Mock(private_key_path="/tmp/key"))
+        client = instance._ssh_connect()
+        client.get_transport.return_value = None
+
+        assert client != instance._ssh_connect()
+        assert 2 == m_paramiko.SSHClient.call_count
+
+    @staticmethod
+    def _closable_client():
+        """Return a mock client losing its transport once closed, like paramiko's."""
+        client = mock.Mock()
+        client.close.side_effect = lambda: setattr(client.get_transport, "return_value", None)
+        return client
+
+    def test_dropped_shared_connection_kept_for_holders(
+        self, m_paramiko, _m_ip, concrete_instance_cls
+    ):
+        """Test dropping a shared connection doesn't close it under other holders."""
+        m_paramiko.SSHClient.side_effect = self._closable_client
+        key_pair = mock.Mock(private_key_path="/tmp/key")
+        deleted = concrete_instance_cls(key_pair=key_pair)
+        surviving = concrete_instance_cls(key_pair=key_pair)
+        client = deleted._ssh_connect()
+        assert client == surviving._ssh_connect()
+        deleted._drop_ssh_connection()
+
+        assert 0 == client.close.call_count
+        assert client == surviving._ssh_connect()
+        surviving.close()
+        client.close.assert_called_once_with()
+
+    @mock.patch("pycloudlib._ssh_pool.MAX_CONNECTIONS", 1)
+    def test_evicted_connection_kept_for_holder(self, m_paramiko, m_ip, concrete_instance_cls):
+        """Test evicting a connection from the pool doesn't close it under its holder."""
+        m_paramiko.SSHClient.side_effect = self._closable_client
+        key_pair = mock.Mock(private_key_path="/tmp/key")
+        holder = concrete_instance_cls(key_pair=key_pair)
+        client = holder._ssh_connect()
+        m_ip.return_value = "10.0.0.2"
+        other = concrete_instance_cls(key_pair=key_pair)
+        other._ssh_connect()
+
+        assert 0 == client.close.call_count
+        assert client == holder._ssh_connect()
+
+    def test_failed_exec_drops_client(self, m_paramiko, _m_ip, concrete_instance_cls):
+        """Test a client failing to run a command is not reused."""
+        instance = concrete_instance_cls(key_pair=mock.Mock(private_key_path="/tmp/key"))
+        client = instance._ssh_connect()
+        client.exec_command.side_effect = SSHException
+
+        with pytest.raises(SSHException):
+            instance._ssh(["whoami"])
+        assert instance._ssh_client is None
+
+    @mock.patch("pycloudlib._ssh.paramiko")
+    def test_private_key_parsed_once(
+        self, m_ssh_paramiko, _m_paramiko, _m_ip, tmp_path, concrete_instance_cls
+    ):
+        """Test the private key is parsed once and reused on reconnection."""
+        key_path = tmp_path / "key"
+        key_path.write_text("key")
+        _ssh.parse_private_key.cache_clear()
+        key_pair = mock.Mock(private_key_path=str(key_path))
+        client = concrete_instance_cls(key_pair=key_pair)._ssh_connect()
+        client.get_transport.return_value.is_active.return_value = False
+        concrete_instance_cls(key_pair=key_pair)._ssh_connect()
+
+        pkey = m_ssh_paramiko.PKey.from_path.return_value
+        m_ssh_paramiko.PKey.from_path.assert_called_once_with(str(key_path))
+        assert 2 == client.connect.call_count
+        assert pkey == client.connect.call_args.kwargs["pkey"]
+        assert client.connect.call_args.kwargs["key_filename"] is None
+
+    @mock.patch("pycloudlib._ssh.paramiko")
+    def test_passphrase_required_cached(
+        self, m_ssh_paramiko, _m_paramiko, _m_ip, tmp_path, concrete_instance_cls, caplog
+    ):
+        """Test a key requiring a passphrase is only probed and warned about once."""
+        key_path = tmp_path / "key"
+        key_path.write_text("key")
+        _ssh.parse_private_key.cache_clear()
+        m_ssh_paramiko.PKey.from_path.side_effect = TypeError
+        key_pair = mock.Mock(private_key_path=str(key_path))
+        for _ in range(2):
+            client = concrete_instance_cls(key_pair=key_pair)._ssh_connect()
+            client.get_transport.return_value.is_active.return_value = False
+
+        assert 1 == m_ssh_paramiko.PKey.from_path.call_count
+        assert 1 == caplog.text.count("requires a passphrase")
+        assert client.connect.call_args.kwargs["pkey"] is None
+        assert str(key_path) == client.connect.call_args.kwargs["key_filename"]
+
+    @mock.patch("pycloudlib._ssh.paramiko")
+    def test_unparsable_key_passed_by_filename(
+        self, m_ssh_paramiko, _m_paramiko, _m_ip, tmp_path, concrete_instance_cls
+    ):
+        """Test a key paramiko can't parse up front is passed by filename."""
+        key_path = tmp_path / "key"
+        key_path.write_text("key")
+        _ssh.parse_private_key.cache_clear()
+        m_ssh_paramiko.UnknownKeyType = paramiko.UnknownKeyType
+        m_ssh_paramiko.PKey.from_path.side_effect = paramiko.UnknownKeyType
+        client = concrete_instance_cls(
+            key_pair=mock.Mock(private_key_path=str(key_path))
+        )._ssh_connect()
+
+        assert client.connect.call_args.kwargs["pkey"] is None
+        assert str(key_path) == client.connect.call_args.kwargs["key_filename"]
+
+    @mock.patch("pycloudlib._ssh.paramiko")
+    def test_key_type_tried_without_from_path(
+        self, m_ssh_paramiko, _m_paramiko, _m_ip, tmp_path, concrete_instance_cls
+    ):
+        """Test each key type is tried in turn with older paramiko."""
+        key_path = tmp_path / "key"
+        key_path.write_text("key")
+        _ssh.parse_private_key.cache_clear()
+        del m_ssh_paramiko.PKey.from_path
+        m_ssh_paramiko.Ed25519Key.from_private_key_file.side_effect = SSHException
+        client = concrete_instance_cls(
+            key_pair=mock.Mock(private_key_path=str(key_path))
+        )._ssh_connect()
+
+        pkey = m_ssh_paramiko.ECDSAKey.from_private_key_file.return_value
+        assert pkey == client.connect.call_args.kwargs["pkey"]
+        assert 0 == m_ssh_paramiko.RSAKey.from_private_key_file.call_count
+
+    def test_pooled_connection_shared(self, m_paramiko, _m_ip, concrete_instance_cls):
+        """Test instances connecting to the same endpoint share a connection."""
+        key_pair = mock.Mock(private_key_path="/tmp/key")
+        client = concrete_instance_cls(key_pair=key_pair)._ssh_connect()
+        client.get_transport.return_value.is_active.return_value = True
+
+        assert client == concrete_instance_cls(key_pair=key_pair)._ssh_connect()
+        assert 1 == m_paramiko.SSHClient.call_count
+
+    def test_pooled_connection_not_shared_across_users(
+        self, m_paramiko, _m_ip, concrete_instance_cls
+    ):
+        """Test connections are only shared for the same username."""
+        key_pair = mock.Mock(private_key_path="/tmp/key")
+        concrete_instance_cls(key_pair=key_pair)._ssh_connect()
+        concrete_instance_cls(key_pair=key_pair, username="root")._ssh_connect()
+
+        assert 2 == m_paramiko.SSHClient.call_count
+
+    def test_inactive_pooled_connection_replaced(self, m_paramiko, _m_ip, concrete_instance_cls):
+        """Test a pooled connection which is no longer active is replaced."""
+        key_pair = mock.Mock(private_key_path="/tmp/key")
+        client = concrete_instance_cls(key_pair=key_pair)._ssh_connect()
+        client.get_transport.return_value.is_active.return_value = False
+        concrete_instance_cls(key_pair=key_pair)._ssh_connect()
+
+        assert 2 == client.connect.call_count
+        client.close.assert_called_once_with()
+
+
+@mock.patch("pycloudlib.instance.paramiko.SFTPClient.from_transport")
+class TestSFTPConnect:
+    """Tests covering pycloudlib.instance.Instance._sftp_connect."""
+
+    def test_large_window(self, m_from_transport, concrete_instance_cls):
+        """Test the SFTP channel is opened with a large window."""
+        client = mock.Mock()
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(instance, "_ssh_connect", return_value=client):
+            assert m_from_transport.return_value == instance._sftp_connect()
+
+        m_from_transport.assert_called_once_with(
+            client.get_transport.return_value,
+            window_size=64 * 1024 * 1024,
+            max_packet_size=256 * 1024,
+        )
+
+
+class TestFileTransfer:
+    """Tests covering pycloudlib.instance.Instance.{pull,push}_file."""
+
+    def test_pull_file(self, tmp_path, concrete_instance_cls):
+        """Test the remote file is prefetched and streamed to disk."""
+        remote_file = mock.MagicMock()
+        chunks = [b"content", b""]
+
+        def readinto(buf):
+            chunk = chunks.pop(0)
+            buf[: len(chunk)] = chunk
+            return len(chunk)
+
+        remote_file.__enter__.return_value.readinto.side_effect = readinto
+        sftp = mock.Mock()
+        sftp.open.return_value = remote_file
+        local_path = tmp_path / "pulled"
+
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(instance, "_sftp_connect", return_value=sftp):
+            instance.pull_file("/remote/file", str(local_path))
+
+        sftp.open.assert_called_once_with("/remote/file", "rb")
+        remote_file.__enter__.return_value.prefetch.assert_called_once_with(
+            max_concurrent_requests=64
+        )
+        assert b"content" == local_path.read_bytes()
+
+    def test_push_file(self, tmp_path, concrete_instance_cls):
+        """Test the local file is streamed with pipelined writes."""
+        written = []
+        remote_file = mock.MagicMock()
+        remote_file.__enter__.return_value.write.side_effect = lambda data: written.append(
+            bytes(data)
+        )
+        sftp = mock.Mock()
+        sftp.open.return_value = remote_file
+        local_path = tmp_path / "pushed"
+        local_path.write_bytes(b"content")
+
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(instance, "_sftp_connect", return_value=sftp):
+            instance.push_file(str(local_path), "/remote/file")
+
+        sftp.open.assert_called_once_with("/remote/file", "wb")
+        remote_file.__enter__.return_value.set_pipelined.assert_called_once_with(True)
+        assert [b"content"] == written
+
+
+class TestClose:
+    """Tests covering pycloudlib.instance.Instance.close."""
+
+    @mock.patch("pycloudlib.instance._ssh_pool.discard")
+    def test_close(self, m_discard, concrete_instance_cls):
+        """Test the SFTP client is closed and the pooled SSH client kept."""
+        instance = concrete_instance_cls(key_pair=None)
+        ssh_client = instance._ssh_client = mock.Mock()
+        instance._ssh_pool_key = ("10.0.0.1", "ubuntu", 22, "/tmp/key")
+        sftp_client = instance._sftp_client = mock.Mock()
+        instance.close()
+
+        assert 0 == ssh_client.close.call_count
+        assert 0 == m_discard.call_count
+        sftp_client.close.assert_called_once_with()
+        assert instance._ssh_client is None
+        assert instance._sftp_client is None
+
+    @mock.patch("pycloudlib.instance._ssh_pool.discard")
+    def test_del_keeps_pooled_connection(self, m_discard, concrete_instance_cls):
+        """Test garbage collected instances leave their connection for reuse."""
+        instance = concrete_instance_cls(key_pair=None)
+        ssh_client = instance._ssh_client = mock.Mock()
+        instance._ssh_pool_key = ("10.0.0.1", "ubuntu", 22, "/tmp/key")
+        instance.__del__()
+
+        assert 0 == ssh_client.close.call_count
+        assert 0 == m_discard.call_count
+        assert instance._ssh_client is None
+
+    def test_context_manager_closes(self, concrete_instance_cls):
+        """Test leaving the context manager deletes then closes the instance."""
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.multiple(instance, delete=mock.DEFAULT, close=mock.DEFAULT) as mocks:
+            mocks["delete"].return_value = []
+            with instance:
+                pass
+        mocks["delete"].assert_called_once_with()
+        mocks["close"].assert_called_once_with()
+
+    @mock.patch("pycloudlib.instance._ssh_pool.discard")
+    def test_drop_ssh_connection(self, m_discard, concrete_instance_cls):
+        """Test deleted instances close their pooled connection."""
+        instance = concrete_instance_cls(key_pair=None)
+        instance._ssh_client = mock.Mock()
+        instance._ssh_pool_key = ("10.0.0.1", "ubuntu", 22, "/tmp/key")
+        instance._drop_ssh_connection()
+
+        m_discard.assert_called_once_with(("10.0.0.1", "ubuntu", 22, "/tmp/key"))
+        assert instance._ssh_client is None
+        assert instance._ssh_pool_key is None
+
+
+class TestExecuteBatch:
+    """Tests covering pycloudlib.instance.Instance.execute_batch."""
+
+    @pytest.mark.parametrize(
+        "stop_on_error, expected_script",
+        [
+            (True, "sudo apt-get update && echo 'a b' > /tmp/out"),
+            (False, "sudo apt-get update; echo 'a b' > /tmp/out"),
+        ],
+    )
+    def test_single_execute(self, stop_on_error, expected_script, concrete_instance_cls):
+        """Test commands are joined into a single remote shell invocation."""
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(instance, "execute") as m_execute:
+            result = instance.execute_batch(
+                [["sudo", "apt-get", "update"], "echo 'a b' > /tmp/out"],
+                stop_on_error=stop_on_error,
+            )
+
+        assert m_execute.return_value == result
+        m_execute.assert_called_once_with(["sh", "-c", expected_script], description=None)
+
+    def test_install(self, concrete_instance_cls):
+        """Test install checks, updates and installs in a single round-trip."""
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(instance, "execute") as m_execute:
+            instance.install("pkg1 pkg2")
+
+        m_execute.assert_called_once_with(
+            [
+                "sh",
+                "-c",
+                "if [ \"$(dpkg-query -W -f='${Status}\\n' pkg1 pkg2 2>/dev/null"
+                " | grep -c '^install ok installed$')\" -eq 2 ]; then"
+                " echo 'All packages are already installed'; exit 0; fi"
+                " && sudo apt-get update"
+                " || echo 'pycloudlib: apt-get update failed' >&2"
+                " && DEBIAN_FRONTEND=noninteractive sudo apt-get install --yes pkg1 pkg2",
+            ],
+            description=None,
+        )
+
+    @pytest.mark.parametrize(
+        "first_result, updated_again",
+        [
+            pytest.param(Result("", "", 0), False, id="updated"),
+            pytest.param(Result("", "", 100), True, id="failed"),
+            pytest.param(
+                Result("", "pycloudlib: apt-get update failed", 0), True, id="update_failed"
             ),
-            mock.call(
-                ["cloud-init", "status", "--wait", "--long"],
-                description="waiting for start",
+            pytest.param(
+                Result("All packages are already installed", "", 0), True, id="nothing_to_install"
+            ),
+        ],
+    )
+    def test_recent_update_not_repeated(self, first_result, updated_again, concrete_instance_cls):
+        """Test package lists are only updated again if not freshly updated."""
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(instance, "execute", return_value=first_result) as m_execute:
+            instance.install("pkg1")
+            instance.install("pkg2")
+            instance.update()
+
+        scripts = [call.args[0][2] for call in m_execute.call_args_list]
+        assert "apt-get update" in scripts[0]
+        assert updated_again == ("apt-get update" in scripts[1])
+        assert updated_again == ("apt-get update" in scripts[2])
+
+    def test_stale_lists_updated(self, concrete_instance_cls):
+        """Test package lists are updated again once no longer fresh."""
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(instance, "execute", return_value=Result("", "", 0)) as m_execute:
+            instance.update()
+            instance._apt_updated_at -= pycloudlib_instance._APT_LISTS_MAX_AGE + 1
+            instance.update()
+
+        assert 2 == sum("apt-get update" in call.args[0][2] for call in m_execute.call_args_list)
+
+    @pytest.mark.parametrize(
+        "run_between",
+        [
+            pytest.param(
+                lambda instance: instance.execute("add-apt-repository ppa:a/b"), id="execute"
             ),
+            pytest.param(lambda instance: instance.restart(wait=False), id="restart"),
+        ],
+    )
+    def test_lists_updated_after_other_commands(self, run_between, concrete_instance_cls):
+        """Test package lists are updated again once other commands may have changed sources."""
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.multiple(
+            instance,
+            _run_command=mock.Mock(return_value=Result("", "", 0)),
+            _sync_filesystem=mock.DEFAULT,
+            _do_restart=mock.DEFAULT,
+        ):
+            instance.install("pkg1")
+            instance.install("pkg2")
+            run_between(instance)
+            instance.install("pkg3")
+            scripts = [call.args[0][2] for call in instance._run_command.call_args_list]
+
+        assert [True, False, True] == [
+            "apt-get update" in script for script in scripts if "apt-get install" in script
         ]
-        assert expected == m_execute.call_args_list
+
+
+class TestExecute:
+    """Tests covering pycloudlib.instance.Instance.execute."""
+
+    @mock.patch("pycloudlib.instance.shell_quote", return_value="quoted")
+    def test_quoting_deferred_to_logging(self, m_shell_quote, concrete_instance_cls, caplog):
+        """Test the command is only quoted when the log record is emitted."""
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(instance, "_run_command"):
+            with caplog.at_level(logging.WARNING):
+                instance.execute(["whoami"])
+            assert 0 == m_shell_quote.call_count
+
+            with caplog.at_level(logging.DEBUG):
+                instance.execute(["whoami"])
+        assert 1 == m_shell_quote.call_count
+        assert "executing: quoted" in caplog.text
+
+
+class TestExecuteOnInstances:
+    """Tests covering pycloudlib.instance.execute_on_instances."""
+
+    def test_results_per_instance(self):
+        """Test the command is executed on every instance."""
+        instances = [mock.Mock(), mock.Mock()]
+
+        results = pycloudlib_instance.execute_on_instances(instances, "whoami", use_sudo=True)
+
+        assert {instance: instance.execute.return_value for instance in instances} == results
+        for instance in instances:
+            instance.execute.assert_called_once_with("whoami", use_sudo=True)
+
+    def test_no_instances(self):
+        """Test nothing is executed without instances."""
+        assert {} == pycloudlib_instance.execute_on_instances([], "whoami")
+
+
+class TestExecuteAsync:
+    """Tests covering pycloudlib.instance.Instance.execute_async."""
+
+    def test_concurrent_commands(self, concrete_instance_cls):
+        """Test awaited commands are executed with their arguments."""
+        instance = concrete_instance_cls(key_pair=None)
+
+        async def run_all():
+            return await asyncio.gather(
+                instance.execute_async("whoami"),
+                instance.execute_async(["id"], use_sudo=True),
+            )
+
+        with mock.patch.object(instance, "execute", side_effect=lambda cmd, **_: cmd):
+            assert ["whoami", ["id"]] == asyncio.run(run_all())
+
+
+@mock.patch("pycloudlib._ssh.select.select")
+class TestExecuteMany:
+    """Tests covering pycloudlib.instance.Instance.execute_many."""
+
+    @staticmethod
+    def _channel(out, return_code):
+        channel = mock.Mock()
+        channel.recv_ready.side_effect = [True, False, False]
+        channel.recv.return_value = out
+        channel.recv_stderr_ready.return_value = False
+        channel.eof_received = True
+        channel.recv_exit_status.return_value = return_code
+        return channel
+
+    def test_commands_run_concurrently(self, _m_select, concrete_instance_cls):
+        """Test each command runs on its own channel and gets its result."""
+        channels = [self._channel(b"one\n", 0), self._channel(b"two\n", 1)]
+        client = mock.Mock()
+        client.exec_command.side_effect = [
+            (mock.Mock(channel=channel), None, None) for channel in channels
+        ]
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(instance, "_get_ssh_client", return_value=(client, False)):
+            results = instance.execute_many(["echo one", ["echo", "two"]])
+
+        assert ["one", "two"] == results
+        assert [0, 1] == [result.return_code for result in results]
+        assert 2 == client.exec_command.call_count
+        for channel in channels:
+            channel.shutdown_write.assert_called_once_with()
+
+    @mock.patch("pycloudlib.instance._MAX_CONCURRENT_CHANNELS", 2)
+    def test_concurrency_capped(self, _m_select, concrete_instance_cls):
+        """Test commands are run in groups of at most the concurrency cap."""
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(
+            instance, "_ssh_submit", side_effect=lambda _: self._channel(b"", 0)
+        ) as m_submit, mock.patch(
+            "pycloudlib._ssh.collect_results", side_effect=lambda channels: channels
+        ) as m_collect:
+            instance.execute_many(["true"] * 5, no_log=True)
+
+        assert 5 == m_submit.call_count
+        assert [2, 2, 1] == [len(call.args[0]) for call in m_collect.call_args_list]
+
+
+class TestGetBootId:
+    """Tests covering pycloudlib.instance.Instance.get_boot_id."""
+
+    def test_open_sftp_session_reused(self, concrete_instance_cls):
+        """Test the boot id is read over an open SFTP session."""
+        instance = concrete_instance_cls(key_pair=None)
+        sftp = instance._sftp_client = mock.MagicMock()
+        sftp.open.return_value.__enter__.return_value.read.return_value = b"boot-id\n"
+        with mock.patch.object(instance, "execute") as m_execute:
+            assert "boot-id" == instance.get_boot_id()
+
+        sftp.open.assert_called_once_with("/proc/sys/kernel/random/boot_id", "rb")
+        assert 0 == m_execute.call_count
+
+    def test_sftp_failure_falls_back_to_execute(self, concrete_instance_cls):
+        """Test the boot id is read with a command if the SFTP session failed."""
+        instance = concrete_instance_cls(key_pair=None)
+        sftp = instance._sftp_client = mock.Mock()
+        sftp.open.side_effect = EOFError
+        with mock.patch.object(
+            instance, "execute", return_value=Result("boot-id", "", 0)
+        ) as m_execute:
+            assert "boot-id" == instance.get_boot_id()
+
+        m_execute.assert_called_once_with(["cat", "/proc/sys/kernel/random/boot_id"], no_log=True)
+        assert instance._sftp_client is None
+
+
+class TestSyncAndGetBootId:
+    """Tests covering pycloudlib.instance.Instance._sync_and_get_boot_id."""
+
+    def test_single_command(self, concrete_instance_cls):
+        """Test syncing and reading the boot id happen in one command."""
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(
+            instance, "execute", return_value=Result("boot-id", "", 0)
+        ) as m_execute:
+            assert "boot-id" == instance._sync_and_get_boot_id()
+
+        m_execute.assert_called_once_with("sync; cat /proc/sys/kernel/random/boot_id", no_log=True)
+
+    def test_failure(self, concrete_instance_cls):
+        """Test a failure to read the boot id raises."""
+        instance = concrete_instance_cls(key_pair=None)
+        with mock.patch.object(instance, "execute", return_value=Result("", "", 1)):
+            with pytest.raises(OSError):
+                instance._sync_and_get_boot_id()
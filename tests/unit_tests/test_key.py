@@ -0,0 +1,46 @@
+"""Tests related to pycloudlib.key module."""
+
+import pickle
+
+import pytest
+
+from pycloudlib.errors import UnsetSSHKeyError
+from pycloudlib.key import KeyPair
+
+
+class TestPublicKeyContent:
+    """Tests covering pycloudlib.key.KeyPair.public_key_content."""
+
+    def test_read_once(self, tmp_path):
+        """Test the public key is read on first access only."""
+        public_key = tmp_path / "id_ed25519.pub"
+        public_key.write_text("ssh-ed25519 AAAA")
+        key_pair = KeyPair(str(public_key))
+
+        assert "ssh-ed25519 AAAA" == key_pair.public_key_content
+        public_key.unlink()
+        assert "ssh-ed25519 AAAA" == key_pair.public_key_content
+        assert "ssh-ed25519 AAAA" == pickle.loads(pickle.dumps(key_pair)).public_key_content
+
+    def test_path_changed(self, tmp_path):
+        """Test the public key is read again once its path changes."""
+        (tmp_path / "id_rsa.pub").write_text("ssh-rsa AAAA")
+        (tmp_path / "id_ed25519.pub").write_text("ssh-ed25519 AAAA")
+        key_pair = KeyPair(str(tmp_path / "id_rsa.pub"))
+
+        assert "ssh-rsa AAAA" == key_pair.public_key_content
+        key_pair.public_key_path = str(tmp_path / "id_ed25519.pub")
+        assert "ssh-ed25519 AAAA" == key_pair.public_key_content
+
+    def test_unset(self):
+        """Test reading an unset public key raises."""
+        with pytest.raises(UnsetSSHKeyError):
+            KeyPair(None).public_key_content  # pylint: disable=expression-not-assigned
+
+
+def test_no_instance_dict():
+    """Test key pairs don't carry a per-instance __dict__."""
+    key_pair = KeyPair("/home/user/.ssh/id_rsa.pub")
+    assert not hasattr(key_pair, "__dict__")
+    with pytest.raises(AttributeError):
+        key_pair.unknown = True  # pylint: disable=assigning-non-slot
@@ -0,0 +1,95 @@
+"""Tests related to pycloudlib._ssh module."""
+
+from unittest import mock
+
+import pytest
+
+from pycloudlib import _ssh
+
+
+class TestDecodeOutput:
+    """Tests covering pycloudlib._ssh.decode_output."""
+
+    @pytest.mark.parametrize(
+        "buf, end, expected",
+        [
+            (bytearray(), None, ""),
+            (bytearray(b" \n"), None, ""),
+            (bytearray("héllo\r\n\n".encode()), None, "héllo"),
+            (bytearray(b"out \n__marker__"), 5, "out"),
+        ],
+    )
+    def test_decode(self, buf, end, expected):
+        """Test output is decoded without its trailing whitespace."""
+        assert expected == _ssh.decode_output(buf, end)
+
+
+@mock.patch("pycloudlib._ssh.select.select")
+class TestDrainUntilMarker:
+    """Tests covering pycloudlib._ssh.drain_until_marker."""
+
+    @staticmethod
+    def _channel(out_chunks, err_chunks):
+        channel = mock.Mock(closed=False)
+        channel.recv_ready.side_effect = [True, False] * len(out_chunks) + [False] * 10
+        channel.recv.side_effect = out_chunks
+        channel.recv_stderr_ready.side_effect = [True, False] * len(err_chunks) + [False] * 10
+        channel.recv_stderr.side_effect = err_chunks
+        channel.eof_received = False
+        return channel
+
+    def test_markers_split_between_reads(self, _m_select):
+        """Test markers are found when split between reads."""
+        channel = self._channel(
+            [b"x" * 100, b"out\n__mark", b"er__:3\n"], [b"err\n__mar", b"ker__\n"]
+        )
+        out_buf, err_buf = bytearray(), bytearray()
+
+        assert (103, 3, 3) == _ssh.drain_until_marker(channel, out_buf, err_buf, b"__marker__")
+
+    def test_exited_before_markers(self, _m_select):
+        """Test None is returned when the remote end exits first."""
+        channel = self._channel([b"out\n"], [])
+        channel.eof_received = True
+
+        assert _ssh.drain_until_marker(channel, bytearray(), bytearray(), b"__marker__") is None
+
+
+@mock.patch("pycloudlib._ssh.select.select")
+class TestCollectResults:
+    """Tests covering pycloudlib._ssh.collect_results."""
+
+    def test_output_after_exit_status(self, _m_select):
+        """Test output sent after the exit status is read until EOF."""
+        channel = mock.Mock(closed=False)
+        channel.exit_status_ready.return_value = True
+        channel.recv_exit_status.return_value = 0
+        # Nothing is buffered yet when the exit status is already known
+        channel.recv_ready.side_effect = [False, True, False, False]
+        channel.recv.side_effect = [b"late output\n"]
+        channel.recv_stderr_ready.return_value = False
+        type(channel).eof_received = mock.PropertyMock(side_effect=[False, True])
+
+        assert [("late output", "", 0)] == [
+            (result.stdout, result.stderr, result.return_code)
+            for result in _ssh.collect_results([channel])
+        ]
+
+
+class TestPrefetch:
+    """Tests covering pycloudlib._ssh.prefetch."""
+
+    @pytest.mark.parametrize(
+        "bounded, expected_call",
+        [
+            pytest.param(True, mock.call(max_concurrent_requests=8), id="bounded"),
+            pytest.param(False, mock.call(), id="paramiko_lt_3_3"),
+        ],
+    )
+    def test_prefetch(self, bounded, expected_call):
+        """Test requests in flight are only bounded where paramiko supports it."""
+        remote_file = mock.Mock()
+        with mock.patch.object(_ssh, "_PREFETCH_BOUNDED", bounded):
+            _ssh.prefetch(remote_file, 8)
+
+        assert [expected_call] == remote_file.prefetch.call_args_list
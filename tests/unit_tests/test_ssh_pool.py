@@ -0,0 +1,127 @@
+"""Tests related to pycloudlib._ssh_pool module."""
+
+from unittest import mock
+
+import pytest
+
+from pycloudlib import _ssh_pool
+
+# Disable this pylint check as fixture usage incorrectly triggers it:
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture(autouse=True)
+def empty_pool():
+    """Ensure no pooled connection leaks between tests."""
+    _ssh_pool.close_all()
+    yield
+    _ssh_pool.close_all()
+
+
+class TestPool:
+    """Tests covering the pycloudlib._ssh_pool functions."""
+
+    def test_get_active(self):
+        """Test an active pooled client is returned."""
+        client = mock.Mock()
+        _ssh_pool.put("key", client)
+
+        assert client == _ssh_pool.get("key")
+        assert _ssh_pool.get("other") is None
+
+    def test_inactive_dropped(self):
+        """Test an inactive pooled client is closed and dropped."""
+        client = mock.Mock()
+        client.get_transport.return_value.is_active.return_value = False
+        _ssh_pool.put("key", client)
+        _ssh_pool.release(client)
+
+        assert _ssh_pool.get("key") is None
+        client.close.assert_called_once_with()
+
+    @mock.patch("pycloudlib._ssh_pool.time.monotonic")
+    def test_max_age(self, m_monotonic):
+        """Test a client older than MAX_AGE is closed and dropped."""
+        client = mock.Mock()
+        m_monotonic.return_value = 100
+        _ssh_pool.put("key", client)
+        _ssh_pool.release(client)
+
+        m_monotonic.return_value = 100 + _ssh_pool.MAX_AGE
+        assert client == _ssh_pool.get("key")
+        _ssh_pool.release(client)
+        m_monotonic.return_value = 101 + _ssh_pool.MAX_AGE
+        assert _ssh_pool.get("key") is None
+        client.close.assert_called_once_with()
+
+    @mock.patch("pycloudlib._ssh_pool.MAX_CONNECTIONS", 2)
+    def test_lru_eviction(self):
+        """Test the least recently used client is evicted once full."""
+        clients = [mock.Mock() for _ in range(3)]
+        for key in range(2):
+            _ssh_pool.put(key, clients[key])
+            _ssh_pool.release(clients[key])
+        _ssh_pool.get(0)
+        _ssh_pool.put(2, clients[2])
+
+        clients[1].close.assert_called_once_with()
+        assert _ssh_pool.get(1) is None
+        assert clients[0] == _ssh_pool.get(0)
+        assert clients[2] == _ssh_pool.get(2)
+
+    def test_discard(self):
+        """Test a discarded client is closed."""
+        client = mock.Mock()
+        _ssh_pool.put("key", client)
+        _ssh_pool.release(client)
+        _ssh_pool.discard("key")
+
+        client.close.assert_called_once_with()
+        assert _ssh_pool.get("key") is None
+
+    def test_discard_keeps_newer_client(self):
+        """Test discarding a replaced client keeps the newer one pooled."""
+        client = mock.Mock()
+        _ssh_pool.put("key", client)
+        _ssh_pool.discard("key", mock.Mock())
+
+        assert 0 == client.close.call_count
+        assert client == _ssh_pool.get("key")
+        _ssh_pool.discard("key", client)
+        _ssh_pool.release(client)
+        assert 0 == client.close.call_count
+        _ssh_pool.release(client)
+        client.close.assert_called_once_with()
+
+    @mock.patch("pycloudlib._ssh_pool.MAX_CONNECTIONS", 1)
+    def test_held_client_not_closed_on_eviction(self):
+        """Test an evicted client is only closed once no longer held."""
+        client = mock.Mock()
+        _ssh_pool.put(0, client)
+        _ssh_pool.put(1, mock.Mock())
+
+        assert _ssh_pool.get(0) is None
+        assert 0 == client.close.call_count
+        _ssh_pool.release(client)
+        client.close.assert_called_once_with()
+
+    def test_held_client_not_closed_on_discard(self):
+        """Test a discarded client is only closed once every holder released it."""
+        client = mock.Mock()
+        _ssh_pool.put("key", client)
+        assert client == _ssh_pool.get("key")
+        _ssh_pool.discard("key")
+
+        _ssh_pool.release(client)
+        assert 0 == client.close.call_count
+        _ssh_pool.release(client)
+        client.close.assert_called_once_with()
+
+    def test_close_all_closes_held_clients(self):
+        """Test held clients no longer pooled are closed at exit."""
+        client = mock.Mock()
+        _ssh_pool.put("key", client)
+        _ssh_pool.discard("key")
+        _ssh_pool.close_all()
+
+        client.close.assert_called_once_with()
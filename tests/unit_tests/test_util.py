@@ -0,0 +1,88 @@
+"""Tests related to pycloudlib.util module."""
+
+import time
+from unittest import mock
+
+import pytest
+
+from pycloudlib.util import backoff_delay, subp, subp_many
+
+
+class TestBackoffDelay:
+    """Tests covering pycloudlib.util.backoff_delay."""
+
+    @pytest.mark.parametrize(
+        "attempt, base, cap, upper_bound",
+        [
+            (0, 1.0, 30.0, 1.0),
+            (3, 1.0, 30.0, 8.0),
+            (10, 1.0, 30.0, 30.0),
+            (2, 0.5, 30.0, 2.0),
+        ],
+    )
+    @mock.patch("pycloudlib.util.random.uniform")
+    def test_bounds(self, m_uniform, attempt, base, cap, upper_bound):
+        """The delay is drawn between 0 and the capped exponential bound."""
+        assert m_uniform.return_value == backoff_delay(attempt, base=base, cap=cap)
+        m_uniform.assert_called_once_with(0, upper_bound)
+
+    def test_many_attempts(self):
+        """The delay stays capped rather than overflowing after many attempts."""
+        assert 0 <= backoff_delay(10_000, cap=5.0) <= 5.0
+
+
+class TestSubp:
+    """Tests covering pycloudlib.util.subp."""
+
+    def test_runs_command(self):
+        """Test commands are found in PATH and their output returned."""
+        result = subp(["echo", "hello"])
+        assert "hello" == result
+        assert 0 == result.return_code
+
+    def test_command_found_in_env_path(self, tmp_path):
+        """Test commands are looked up in the PATH of the given env, every time."""
+        env = {"PATH": str(tmp_path)}
+        with pytest.raises(FileNotFoundError):
+            subp(["pycloudlib-test-command"], env=env)
+
+        command = tmp_path / "pycloudlib-test-command"
+        command.write_text("#!/bin/sh\necho found\n")
+        command.chmod(0o755)
+        assert "found" == subp(["pycloudlib-test-command"], env=env)
+
+    def test_missing_command(self):
+        """Test missing commands still raise."""
+        with pytest.raises(FileNotFoundError):
+            subp(["pycloudlib-no-such-command"])
+
+
+class TestSubpMany:
+    """Tests covering pycloudlib.util.subp_many."""
+
+    def test_runs_commands(self):
+        """Test every command's result is returned in order, failures included."""
+        first, failed, last = subp_many(
+            [
+                ["sh", "-c", "sleep 0.2; echo first"],
+                ["sh", "-c", "echo oops >&2; exit 3"],
+                ["sh", "-c", "head -c 200000 /dev/zero | tr '\\0' x"],
+            ]
+        )
+
+        assert "first" == first
+        assert 0 == first.return_code
+        assert isinstance(failed, RuntimeError)
+        assert "Failure (rc=3): oops" == str(failed)
+        assert "x" * 200000 == last
+
+    def test_no_commands(self):
+        """Test nothing is run without commands."""
+        assert [] == subp_many([])
+
+    def test_missing_command(self):
+        """Test missing commands raise, after stopping the other commands."""
+        start = time.monotonic()
+        with pytest.raises(FileNotFoundError):
+            subp_many([["sleep", "10"], ["pycloudlib-no-such-command"]])
+        assert time.monotonic() - start < 5